@@ -0,0 +1,65 @@
+"""
+    Per-step overhead of the interpreter and of the compiled loss graph.
+
+    $ python -m benchmarks.aot
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.core.attribute import CacheIndex
+from mp.core.compiler import CompiledGraph
+from mp.engine.pytorch.framework import torch
+
+
+def build(num_layers: int, size: int):
+    lines = ['optim = Adam()', 'x = randn(8, %d)' % size]
+    for i in range(num_layers):
+        lines.append('w%d = var(randn(%d, %d), optim)' % (i, size, size))
+        lines.append('x = relu(dense(x, w%d) / 2. + 1)' % i)
+    lines += ['loss = mean(x ** 2)', 'print loss']
+    interpreter = PyTorchInterpreter('.')
+    with redirect_stdout(StringIO()):
+        interpreter('\n'.join(lines))
+    return interpreter
+
+
+def measure(num_layers: int, size: int, num_steps: int, use_aot: bool):
+    torch.manual_seed(0)
+    interpreter = build(num_layers, size)
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    index = CacheIndex(loss_graph)
+    compiled = CompiledGraph(loss_graph, index) if use_aot else None
+    forward = 0.
+    begin = perf_counter()
+    for _ in range(num_steps):
+        begin_forward = perf_counter()
+        if compiled is not None:
+            loss = compiled()
+        else:
+            index.invalidate()
+            loss = loss_graph.get_value()
+        forward += perf_counter() - begin_forward
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+    return forward / num_steps, (perf_counter() - begin) / num_steps, loss.item()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.aot', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-layers', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('-d', '--size', type=int, default=16)
+    parser.add_argument('-s', '--num-steps', type=int, default=500)
+    args = parser.parse_args()
+
+    for num_layers in args.num_layers:
+        forward, step, loss = measure(num_layers, args.size, args.num_steps, False)
+        forward_aot, step_aot, loss_aot = measure(num_layers, args.size, args.num_steps, True)
+        assert abs(loss - loss_aot) <= 1e-6 * max(1., abs(loss))
+        print('%4d layers : forward %8.1f us -> %8.1f us (x%.1f) / step %8.1f us -> %8.1f us (x%.1f)' % (
+            num_layers, forward * 1e6, forward_aot * 1e6, forward / forward_aot,
+            step * 1e6, step_aot * 1e6, step / step_aot))
@@ -0,0 +1,61 @@
+"""
+    Training steps of the MNIST convolution script (synthetic data), in float32 and by bfloat16 autocast.
+
+    $ python -m benchmarks.autocast
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from benchmarks.compile import SCRIPT
+from mp import PyTorchInterpreter
+from mp.core.attribute import CacheIndex
+from mp.core.expression import Expression as Exp
+from mp.engine.pytorch.framework import torch
+
+
+def measure(num_steps: int, batch_size: int, use_autocast: bool, num_warmup: int = 3):
+    torch.manual_seed(0)
+    interpreter = PyTorchInterpreter('.', use_autocast=use_autocast)
+    with redirect_stdout(StringIO()):
+        interpreter(SCRIPT % {'size': batch_size * (num_steps + num_warmup), 'batch': batch_size})
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    Exp.EVENT('reset batch')
+    index = CacheIndex(loss_graph)
+    times = []
+    for _ in range(num_steps + num_warmup):
+        begin = perf_counter()
+        # as StandardTrainer does
+        with Exp.EVENT('autocast forward'):
+            index.invalidate()
+            loss = loss_graph.get_value()
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+        times.append(perf_counter() - begin)
+    times = sorted(times[num_warmup:])
+    return times[len(times) // 2], loss.item()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.autocast', usage='%(prog)s [options]')
+    parser.add_argument('-b', '--batch-size', type=int, default=50)
+    parser.add_argument('-s', '--num-steps', type=int, default=20)
+    parser.add_argument('-r', '--num-repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    # alternated (medians)
+    plain, autocast = [], []
+    for _ in range(args.num_repeats):
+        step, loss = measure(args.num_steps, args.batch_size, False)
+        step_autocast, loss_autocast = measure(args.num_steps, args.batch_size, True)
+        assert abs(loss - loss_autocast) <= 5e-2 * max(1., abs(loss))
+        plain.append(step)
+        autocast.append(step_autocast)
+    plain = sorted(plain)[len(plain) // 2]
+    autocast = sorted(autocast)[len(autocast) // 2]
+    # bfloat16 is fast with AVX512-BF16 or AMX only
+    print('cpu capability : %s' % torch.backends.cpu.get_cpu_capability())
+    print('step : %8.2f ms -> %8.2f ms (x%.2f)' % (plain * 1e3, autocast * 1e3, plain / autocast))
@@ -0,0 +1,71 @@
+"""
+    Evaluation of small operations with builtins bound at build time, against delegating by name.
+
+    $ python -m benchmarks.binding
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.core.event import Event, EventBinding
+from mp.core.expression import Expression as Exp
+
+
+def build(num_terms: int):
+    lines = ['x = randn(4)']
+    lines += ['t%d = x * %d. + abs(x)' % (i, i) for i in range(num_terms)]
+    lines.append('print ' + ', '.join('t%d' % i for i in range(num_terms)))
+    interpreter = PyTorchInterpreter()
+    with redirect_stdout(StringIO()):
+        interpreter('\n'.join(lines))
+    return [interpreter.plan.attr['t%d' % i] for i in range(num_terms)]
+
+
+def unbind(attributes):
+    # reference: resolve the name on each call
+    stack = list(attributes)
+    while len(stack) > 0:
+        attribute = stack.pop()
+        method = getattr(attribute, 'method', None)
+        if type(method) is EventBinding:
+            attribute.method = Event.delegate(method.name, method._hidden)
+        stack.extend(attribute.children)
+
+
+def measure_dispatch(num_calls: int, bound: bool):
+    PyTorchInterpreter()
+    method = Exp.EVENT.bind('__math_add') if bound else Event.delegate('__math_add')
+    begin = perf_counter()
+    for _ in range(num_calls):
+        method(1, 2)
+    return perf_counter() - begin
+
+
+def measure(num_terms: int, num_steps: int, bound: bool):
+    attributes = build(num_terms)
+    if not bound:
+        unbind(attributes)
+    begin = perf_counter()
+    for _ in range(num_steps):
+        for attribute in attributes:
+            attribute.remove_cache()
+            attribute.get_value()
+    return perf_counter() - begin
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.binding', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-terms', type=int, default=200)
+    parser.add_argument('-s', '--num-steps', type=int, default=100)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    delegate = min(measure(args.num_terms, args.num_steps, False) for _ in range(args.repeat))
+    binding = min(measure(args.num_terms, args.num_steps, True) for _ in range(args.repeat))
+    num_calls = args.num_terms * args.num_steps * 3
+    print('dispatch only : delegate %.2f us / binding %.2f us' % tuple(
+        min(measure_dispatch(num_calls, bound) for _ in range(args.repeat)) / num_calls * 1e6 for bound in (False, True)))
+    print('%d builtin calls : delegate %.3f s / binding %.3f s (x%.2f, %.2f us saved per call)' % (
+        num_calls, delegate, binding, delegate / binding, (delegate - binding) / num_calls * 1e6))
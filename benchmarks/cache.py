@@ -0,0 +1,58 @@
+"""
+    Training steps with remove_cache and with CacheIndex.invalidate.
+
+    $ python -m benchmarks.cache
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.core.attribute import CacheIndex
+from mp.engine.pytorch.framework import torch
+
+
+def build(num_ops: int, size: int):
+    lines = ['optim = Adam()', 'w = var(randn(10, %d), optim)' % size, 'x = randn(64, %d)' % size]
+    # preprocessing, unchanged between steps
+    for i in range(num_ops):
+        lines.append('x = relu(x / 2. + %d)' % i)
+    lines += ['loss = mean(dense(x, w) ** 2)', 'print loss']
+    interpreter = PyTorchInterpreter('.')
+    with redirect_stdout(StringIO()):
+        interpreter('\n'.join(lines))
+    return interpreter
+
+
+def measure(num_ops: int, size: int, num_steps: int, use_index: bool):
+    torch.manual_seed(0)
+    interpreter = build(num_ops, size)
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    index = CacheIndex(loss_graph) if use_index else None
+    begin = perf_counter()
+    for _ in range(num_steps):
+        if index is not None:
+            index.invalidate()
+        else:
+            loss_graph.remove_cache()
+        loss = loss_graph.get_value()
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+    return perf_counter() - begin, loss.item()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.cache', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-ops', type=int, nargs='+', default=[5, 15, 30])
+    parser.add_argument('-d', '--size', type=int, default=256)
+    parser.add_argument('-s', '--num-steps', type=int, default=100)
+    args = parser.parse_args()
+
+    for num_ops in args.num_ops:
+        full, loss_full = measure(num_ops, args.size, args.num_steps, False)
+        index, loss_index = measure(num_ops, args.size, args.num_steps, True)
+        assert abs(loss_full - loss_index) <= 1e-6 * max(1., abs(loss_full))
+        print('%4d ops : remove_cache %8.3f s / invalidate %8.3f s (x%.1f)' % (num_ops, full, index, full / index))
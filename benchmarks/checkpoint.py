@@ -0,0 +1,108 @@
+"""
+    Peak memory (RSS) and time of a deep dense stack (synthetic data), with and without the checkpointed segments.
+
+    $ python -m benchmarks.checkpoint
+"""
+import resource
+import subprocess
+import sys
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+
+def build(num_layers: int, segment: int, batch_size: int, size: int, use_checkpoint: bool) -> str:
+    lines = ['optim = Adam()', 'x = randn(%d, %d)' % (batch_size, size)]
+    for i in range(num_layers):
+        lines.append('w%d = var(randn(%d, %d) / %d., optim)' % (i, size, size, int(size ** 0.5)))
+    # the layers of a segment are nested (the variables are kept)
+    for begin in range(0, num_layers, segment):
+        expression = 'x'
+        for i in range(begin, min(begin + segment, num_layers)):
+            expression = 'relu(dense(%s, w%d))' % (expression, i)
+        if use_checkpoint:
+            expression = 'checkpoint(%s)' % expression
+        lines.append('x = %s' % expression)
+    lines += ['loss = mean(x ** 2)', 'print loss']
+    return '\n'.join(lines)
+
+
+# in a new process (the peak cannot be reset)
+def measure(args, use_checkpoint: bool):
+    from mp import PyTorchInterpreter
+    from mp.core.attribute import CacheIndex, MemoryPlan
+    from mp.engine.pytorch.framework import torch
+
+    torch.manual_seed(0)
+    # the first step is calculated while interpreting
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    interpreter = PyTorchInterpreter('.')
+    with redirect_stdout(StringIO()):
+        interpreter(build(args.num_layers, args.segment, args.batch_size, args.size, use_checkpoint))
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    index = CacheIndex(loss_graph)
+    plan = MemoryPlan(index)
+    times = []
+    kept = 0
+    for _ in range(args.num_steps):
+        begin = perf_counter()
+        index.invalidate()
+        saved = dict()
+        # tensors kept for backward (by the storages)
+        with torch.autograd.graph.saved_tensors_hooks(lambda x: _pack(saved, x), lambda x: x):
+            loss = loss_graph.get_value()
+        # and the inputs of the next segments
+        for node in index.nodes.values():
+            if node.event_names == ('checkpoint',):
+                _pack(saved, node.value)
+        kept = max(kept, sum(saved.values()))
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+        plan.release()
+        times.append(perf_counter() - begin)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return after - before, kept, sorted(times)[len(times) // 2], loss.item()
+
+
+def _pack(saved: dict, x):
+    storage = x.untyped_storage()
+    saved[storage.data_ptr()] = storage.nbytes()
+    return x
+
+
+def spawn(args, use_checkpoint: bool):
+    command = [sys.executable, '-m', 'benchmarks.checkpoint', '-n', str(args.num_layers), '-k', str(args.segment),
+               '-b', str(args.batch_size), '-d', str(args.size), '-s', str(args.num_steps)]
+    if use_checkpoint:
+        command.append('--checkpoint')
+    peak, saved, step, loss = subprocess.check_output(command + ['--child']).decode().split()
+    return int(peak), int(saved), float(step), float(loss)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.checkpoint', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-layers', type=int, default=32)
+    parser.add_argument('-k', '--segment', type=int, default=4)
+    parser.add_argument('-b', '--batch-size', type=int, default=4096)
+    parser.add_argument('-d', '--size', type=int, default=512)
+    parser.add_argument('-s', '--num-steps', type=int, default=3)
+    parser.add_argument('--checkpoint', action='store_true')
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+
+    if args.child:
+        print(*measure(args, args.checkpoint))
+        sys.exit(0)
+
+    peak, saved, step, loss = spawn(args, False)
+    peak_checkpoint, saved_checkpoint, step_checkpoint, loss_checkpoint = spawn(args, True)
+    assert abs(loss - loss_checkpoint) <= 1e-4 * max(1., abs(loss))
+    print('%d layers (segments of %d)' % (args.num_layers, args.segment))
+    print('kept for backward : %8.1f MB -> %8.1f MB' % (saved / 2 ** 20, saved_checkpoint / 2 ** 20))
+    # ru_maxrss is in kilobytes (linux)
+    print('peak RSS          : %8.1f MB -> %8.1f MB' % (peak / 1024, peak_checkpoint / 1024))
+    print('step              : %8.1f ms -> %8.1f ms (x%.2f)' % (
+        step * 1e3, step_checkpoint * 1e3, step_checkpoint / step))
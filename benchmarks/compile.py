@@ -0,0 +1,78 @@
+"""
+    Training steps of the MNIST convolution script (synthetic data), eager and by torch.compile.
+
+    $ python -m benchmarks.compile
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.core.attribute import CacheIndex
+from mp.core.expression import Expression as Exp
+from mp.engine.pytorch.compiler import TorchCompiledGraph
+from mp.engine.pytorch.framework import torch
+
+SCRIPT = '''
+train x = batch(randn(%(size)d, 1, 28, 28), %(batch)d)
+train y = batch(long(rand(%(size)d) * 10), %(batch)d)
+optim = Adam()
+weight conv 1 = var(randn(32, 1, 5, 5) / 10., optim)
+weight conv 2 = var(randn(64, 32, 5, 5) / 10., optim)
+bias conv 1 = var(randn(32), optim)
+bias conv 2 = var(randn(64), optim)
+weight dense 1 = var(randn(1024, 64 * 7 * 7) / 100., optim)
+weight dense 2 = var(randn(10, 1024) / 10., optim)
+bias dense 1 = var(randn(1024), optim)
+bias dense 2 = var(randn(10), optim)
+output = relu(conv2d(train x, weight conv 1, bias conv 1, _stride=2, _padding=2))
+output = relu(conv2d(output, weight conv 2, bias conv 2, _stride=2, _padding=2))
+output = output[%(batch)d, 64 * 7 * 7]
+output = relu(dense(output, weight dense 1, bias dense 1))
+output = dense(output, weight dense 2, bias dense 2)
+loss = cross entropy(output, train y)
+print loss
+'''
+
+
+def measure(num_steps: int, batch_size: int, use_compile: bool):
+    torch.manual_seed(0)
+    interpreter = PyTorchInterpreter('.')
+    with redirect_stdout(StringIO()):
+        interpreter(SCRIPT % {'size': batch_size * num_steps, 'batch': batch_size})
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    Exp.EVENT('reset batch')
+    index = CacheIndex(loss_graph)
+    compiled = TorchCompiledGraph(loss_graph, index) if use_compile else None
+    times = []
+    for _ in range(num_steps):
+        begin = perf_counter()
+        if compiled is not None:
+            loss = compiled()
+        else:
+            index.invalidate()
+            loss = loss_graph.get_value()
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+        times.append(perf_counter() - begin)
+    # the first step compiles
+    steady = sorted(times[1:])[len(times[1:]) // 2]
+    return times[0], steady, loss.item()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.compile', usage='%(prog)s [options]')
+    parser.add_argument('-b', '--batch-size', type=int, default=50)
+    parser.add_argument('-s', '--num-steps', type=int, default=30)
+    args = parser.parse_args()
+
+    first, steady, loss = measure(args.num_steps, args.batch_size, False)
+    first_compile, steady_compile, loss_compile = measure(args.num_steps, args.batch_size, True)
+    assert abs(loss - loss_compile) <= 1e-3 * max(1., abs(loss))
+    print('eager   : first step %8.1f ms / steady step %8.2f ms' % (first * 1e3, steady * 1e3))
+    print('compile : first step %8.1f ms / steady step %8.2f ms (x%.2f)' % (
+        first_compile * 1e3, steady_compile * 1e3, steady / steady_compile))
+    print('compile overhead : %.1f s' % (first_compile - first))
@@ -0,0 +1,101 @@
+"""
+    Peak memory (RSS) and time of decompressing gzip IDX files (synthetic data), read at once or streamed by workers.
+
+    $ python -m benchmarks.decompress
+"""
+import gzip
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+import numpy as np
+
+# rows of 28 x 28 bytes
+ROW_SIZE = 28 * 28
+
+
+# the former decompress : the whole file in memory
+def decompress_reference(path: str, offset: int):
+    with gzip.open('%s.gz' % path, 'rb') as f_in:
+        raw = np.frombuffer(f_in.read(), np.uint8, offset=offset)
+        raw = raw.reshape(-1, 1, 28, 28)
+        np.save('%s.npy' % path, raw, allow_pickle=False)
+
+
+# in a new process (the peak cannot be reset)
+def measure(args, mode: str):
+    from mp.dataset import core
+
+    paths = [os.path.join(args.dir, 'split%d' % i) for i in range(args.num_files)]
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    begin = perf_counter()
+    with redirect_stdout(StringIO()):
+        if mode == 'reference':
+            for path in paths:
+                decompress_reference(path, 16)
+        else:
+            jobs = [(path, path, 'gz', 'i8', (-1, 1, 28, 28), 16) for path in paths]
+            core.decompress_all(None, jobs, num_workers=1 if mode == 'stream' else args.num_workers)
+    elapsed = perf_counter() - begin
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    checksum = sum(int(np.load('%s.npy' % path, mmap_mode='r')[::97].sum()) for path in paths)
+    for path in paths:
+        os.remove('%s.npy' % path)
+    return after - before, elapsed, checksum
+
+
+def spawn(args, mode: str):
+    command = [sys.executable, '-m', 'benchmarks.decompress', '-f', str(args.num_files), '-w', str(args.num_workers),
+               '--dir', args.dir, '--mode', mode]
+    peak, elapsed, checksum = subprocess.check_output(command + ['--child']).decode().split()
+    return int(peak), float(elapsed), int(checksum)
+
+
+def _write(path: str, num_images: int):
+    header = b'\0\0\x08\x03' + b''.join(d.to_bytes(4, 'big') for d in (num_images, 28, 28))
+    # by chunks (the peak of this process is inherited by the children)
+    with gzip.open('%s.gz' % path, 'wb', compresslevel=1) as f:
+        f.write(header)
+        for begin in range(0, num_images, 10000):
+            size = min(10000, num_images - begin)
+            f.write(np.random.randint(0, 64, (size, ROW_SIZE), dtype=np.uint8).tobytes())
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.decompress', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-images', type=int, default=100000)
+    parser.add_argument('-f', '--num-files', type=int, default=4)
+    parser.add_argument('-w', '--num-workers', type=int, default=4)
+    parser.add_argument('-r', '--num-repeats', type=int, default=3)
+    parser.add_argument('--dir')
+    parser.add_argument('--mode', default='stream')
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+
+    if args.child:
+        print(*measure(args, args.mode))
+        sys.exit(0)
+
+    modes = ['reference', 'stream', 'workers']
+    results = {mode: [] for mode in modes}
+    with tempfile.TemporaryDirectory() as args.dir:
+        for i in range(args.num_files):
+            _write(os.path.join(args.dir, 'split%d' % i), args.num_images)
+        # alternated (medians)
+        for _ in range(args.num_repeats):
+            for mode in modes:
+                results[mode].append(spawn(args, mode))
+    checksums = set(result[2] for values in results.values() for result in values)
+    assert len(checksums) == 1
+    print('%d files of %.1f MB (%d cpus)' % (args.num_files, args.num_images * ROW_SIZE / 2 ** 20, os.cpu_count()))
+    for mode in modes:
+        peak, elapsed, _ = (sorted(values)[len(values) // 2] for values in zip(*results[mode]))
+        name = 'workers (%d)' % args.num_workers if mode == 'workers' else mode
+        # ru_maxrss is in kilobytes (linux)
+        print('%-12s : peak RSS %8.1f MB / %8.1f ms' % (name, peak / 1024, elapsed * 1e3))
@@ -0,0 +1,62 @@
+"""
+    Change detection of variables with digests, against comparing the source code.
+
+    $ python -m benchmarks.digest
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from sys import getrecursionlimit, setrecursionlimit
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.engine.pytorch.plan import Plan
+
+
+class EncodePlan(Plan):
+    # reference: encode() the whole subtree on each visit
+    def _execute_variable(self, toward):
+        var = self.attr[toward.name]
+        if toward.is_pointer:
+            self._execute_variable_point(var, toward)
+        if toward.toward is not None:
+            if toward.encode() != getattr(var, 'encoded', None) or not var.is_data:
+                self._execute_variable_modify(var, toward)
+                var.encoded = toward.encode()
+        return var
+
+
+def chain(num_vars: int):
+    lines = ['v0 = 0'] + ['v%d = v%d + %d' % (i, i - 1, i) for i in range(1, num_vars)]
+    lines.append('print v%d' % (num_vars - 1))
+    return '\n'.join(lines)
+
+
+def measure(plan, script: str):
+    interpreter = PyTorchInterpreter()
+    interpreter.plan.__class__ = plan
+    elapsed = 0.
+    with redirect_stdout(StringIO()) as output:
+        # the second run reuses everything
+        for _ in range(2):
+            for line in interpreter.code_to_data(script):
+                interpreter.plan.push(line)
+            begin = perf_counter()
+            interpreter.plan.execute()
+            elapsed += perf_counter() - begin
+    return elapsed, output.getvalue()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.digest', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-vars', type=int, nargs='+', default=[100, 400, 800])
+    args = parser.parse_args()
+    # attributes are built recursively
+    setrecursionlimit(max(getrecursionlimit(), 100 * max(args.num_vars)))
+
+    for num_vars in args.num_vars:
+        script = chain(num_vars)
+        encode, output_encode = measure(EncodePlan, script)
+        digest, output_digest = measure(Plan, script)
+        assert output_encode == output_digest
+        print('%4d vars : encode %8.3f s / digest %8.3f s (x%.1f)' % (num_vars, encode, digest, encode / digest))
@@ -0,0 +1,58 @@
+"""
+    Dispatch latency of events, with and without the name index.
+
+    $ python -m benchmarks.event
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.core.event import Event
+from mp.core.expression import Expression as Exp
+
+
+class ScanEvent(Event):
+    # reference: match every unit on each call
+    def _resolve(self, event_name: str, hidden: bool):
+        return tuple((order, event) for order, event in self._events.items() if event.match_name(event_name, hidden))
+
+
+def build(event_type, num_events: int):
+    event = event_type()
+    # builtins of the pytorch engine
+    PyTorchInterpreter()
+    for unit in list(Exp.EVENT._events.values()):
+        event.add_object(unit)
+    # the other events (datasets, monitors, ...)
+    for i in range(num_events):
+        if i % 4 == 0:
+            event.add(r'^header%d[.].*' % i, lambda *args: None, unique=True, is_regex=True)
+        else:
+            event.add('event %d' % i, lambda *args: None)
+    event.add('has next batch', lambda: True)
+    return event
+
+
+def measure(event_type, num_events: int, repeat: int):
+    event = build(event_type, num_events)
+    result = dict()
+    for name, args in [('__math_add', (1, 2)), ('has next batch', ())]:
+        begin = perf_counter()
+        for _ in range(repeat):
+            event(name, *args, hidden=True)
+        result[name] = (perf_counter() - begin) / repeat * 1e6
+    return result
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.event', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-events', type=int, nargs='+', default=[0, 100, 1000])
+    parser.add_argument('-r', '--repeat', type=int, default=20000)
+    args = parser.parse_args()
+
+    for num_events in args.num_events:
+        scan = measure(ScanEvent, num_events, args.repeat)
+        index = measure(Event, num_events, args.repeat)
+        for name in scan.keys():
+            print('%5d events, %-16s : scan %8.2f us / index %6.2f us (x%.1f)' % (
+                num_events, repr(name), scan[name], index[name], scan[name] / index[name]))
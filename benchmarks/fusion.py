@@ -0,0 +1,66 @@
+"""
+    Training steps with and without the fused layers (relu(dense(...)), relu(conv2d(...))).
+
+    $ python -m benchmarks.fusion
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.core.attribute import CacheIndex
+from mp.engine.pytorch.framework import torch
+
+SCRIPTS = {
+    'dense': ['x = randn(%(batch)d, %(size)d)'] +
+             ['x = relu(dense(x, var(randn(%(size)d, %(size)d) / 10., optim), var(randn(%(size)d), optim)))'] * 4,
+    'conv': ['x = randn(%(batch)d, 8, 28, 28)'] +
+            ['x = relu(conv2d(x, var(randn(8, 8, 3, 3) / 10., optim), var(randn(8), optim), _padding=1))'] * 4,
+}
+
+
+def measure(name: str, batch_size: int, size: int, num_steps: int, fuse: bool, num_warmup: int = 10):
+    torch.manual_seed(0)
+    interpreter = PyTorchInterpreter('.')
+    interpreter.plan.FUSE_OPERATORS = fuse
+    lines = ['optim = Adam()'] + SCRIPTS[name] + ['loss = mean(x)', 'print loss']
+    with redirect_stdout(StringIO()):
+        interpreter('\n'.join(lines) % {'batch': batch_size, 'size': size})
+    stats = dict(interpreter.plan.stats)
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    index = CacheIndex(loss_graph)
+    begin = perf_counter()
+    for step in range(num_steps + num_warmup):
+        if step == num_warmup:
+            begin = perf_counter()
+        index.invalidate()
+        loss = loss_graph.get_value()
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+    return (perf_counter() - begin) / num_steps, loss.item(), stats
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.fusion', usage='%(prog)s [options]')
+    parser.add_argument('-b', '--batch-size', type=int, default=64)
+    parser.add_argument('-d', '--size', type=int, default=512)
+    parser.add_argument('-s', '--num-steps', type=int, default=30)
+    parser.add_argument('-r', '--num-repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    for name in SCRIPTS.keys():
+        # alternated (medians)
+        plain, fused = [], []
+        for _ in range(args.num_repeats):
+            time_plain, loss_plain, _ = measure(name, args.batch_size, args.size, args.num_steps, False)
+            time_fused, loss_fused, stats = measure(name, args.batch_size, args.size, args.num_steps, True)
+            assert loss_plain == loss_fused
+            plain.append(time_plain)
+            fused.append(time_fused)
+        plain = sorted(plain)[len(plain) // 2]
+        fused = sorted(fused)[len(fused) // 2]
+        fusions = ', '.join('%s x%d' % (key, value) for key, value in stats.items() if key.startswith('fused'))
+        print('%-6s: %8.3f ms -> %8.3f ms (x%.2f) [%s]' % (name, plain * 1e3, fused * 1e3, plain / fused, fusions))
@@ -0,0 +1,41 @@
+"""
+    Reassignments on a large graph, with and without the reverse-dependency index.
+
+    $ python -m benchmarks.graph
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from mp.core.graph import Graph
+from mp.core.interpreter import Interpreter
+
+
+class ScanGraph(Graph):
+    # reference: scan all variables
+    is_used = Graph._is_used_scan
+
+
+def measure(graph_type, num_vars: int):
+    interpreter = Interpreter()
+    interpreter.plan.graph = graph = graph_type()
+    lines = ['v%d = u%d + c' % (i, i) for i in range(num_vars)]
+    for line in lines:
+        interpreter.plan.push(interpreter.line_to_data(line))
+    # reassign every variable (collects the unused 'u')
+    begin = perf_counter()
+    for i in range(num_vars):
+        interpreter.plan.push(interpreter.line_to_data('v%d = %d' % (i, i)))
+    elapsed = perf_counter() - begin
+    return elapsed, len(graph.vars)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.graph', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-vars', type=int, nargs='+', default=[1000, 2000, 4000])
+    args = parser.parse_args()
+
+    for num_vars in args.num_vars:
+        scan, size_scan = measure(ScanGraph, num_vars)
+        index, size_index = measure(Graph, num_vars)
+        assert size_scan == size_index
+        print('%6d vars : scan %8.3f s / index %8.3f s (x%.1f)' % (num_vars, scan, index, scan / index))
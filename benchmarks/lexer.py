@@ -0,0 +1,33 @@
+"""
+    Throughput of the table-driven lexer against the reference scanner.
+
+    $ python -m benchmarks.lexer
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from mp.core.interpreter import Interpreter
+from mp.engine.pytorch.interpreter import HEADER
+
+
+def measure(scanner, lines, repeat: int):
+    begin = perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            scanner(line)
+    return len(lines) * repeat / (perf_counter() - begin)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.lexer', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-lines', type=int, default=50000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    lines = [line for line in HEADER.split('\n') if len(line) > 0]
+    lines = (lines * (args.num_lines // len(lines) + 1))[:args.num_lines]
+
+    legacy = measure(Interpreter._scanner_legacy, lines, args.repeat)
+    table = measure(Interpreter._scanner, lines, args.repeat)
+    print('legacy scanner : %12.0f lines/sec' % legacy)
+    print('lexer          : %12.0f lines/sec (x%.1f)' % (table, table / legacy))
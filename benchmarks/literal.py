@@ -0,0 +1,33 @@
+"""
+    Cost of numeric-literal recognition against the reference classifier.
+
+    $ python -m benchmarks.literal
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from mp.core.literal import Literal
+
+WORDS = ['weight conv 1', 'x', 'dense', 'bias 2', 'lr', '3', '1e-3', '0.5', '1b', '10i32', '2f16']
+
+
+def measure(classify, words, repeat: int):
+    begin = perf_counter()
+    for _ in range(repeat):
+        for word in words:
+            classify(word)
+    return len(words) * repeat / (perf_counter() - begin)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.literal', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-words', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    words = (WORDS * (args.num_words // len(WORDS) + 1))[:args.num_words]
+
+    reference = measure(Literal._classify_reference, words, args.repeat)
+    literal = measure(Literal.classify, words, args.repeat)
+    print('reference : %12.0f words/sec' % reference)
+    print('literal   : %12.0f words/sec (x%.1f)' % (literal, literal / reference))
@@ -0,0 +1,88 @@
+"""
+    Peak memory (RSS) of the MNIST convolution script (synthetic data), with and without releasing the intermediates.
+
+    $ python -m benchmarks.memory
+"""
+import resource
+import subprocess
+import sys
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+
+SCRIPT = '''
+train x = batch(randn(%(size)d, 1, 28, 28), %(batch)d)
+train y = batch(long(rand(%(size)d) * 10), %(batch)d)
+optim = Adam()
+weight conv 1 = var(randn(32, 1, 5, 5) / 10., optim)
+weight conv 2 = var(randn(64, 32, 5, 5) / 10., optim)
+bias conv 1 = var(randn(32), optim)
+bias conv 2 = var(randn(64), optim)
+weight dense 1 = var(randn(1024, 64 * 7 * 7) / 100., optim)
+weight dense 2 = var(randn(10, 1024) / 10., optim)
+bias dense 1 = var(randn(1024), optim)
+bias dense 2 = var(randn(10), optim)
+output = relu(conv2d(train x, weight conv 1, bias conv 1, _stride=2, _padding=2))
+output = relu(conv2d(output, weight conv 2, bias conv 2, _stride=2, _padding=2))
+output = output[%(batch)d, 64 * 7 * 7]
+output = relu(dense(output, weight dense 1, bias dense 1))
+output = dense(output, weight dense 2, bias dense 2)
+loss = cross entropy(output, train y)
+print loss
+'''
+
+
+# in a new process (the peak cannot be reset)
+def measure(num_steps: int, batch_size: int, release: bool):
+    from mp import PyTorchInterpreter
+    from mp.core.attribute import CacheIndex, MemoryPlan
+    from mp.core.expression import Expression as Exp
+    from mp.engine.pytorch.framework import torch
+
+    torch.manual_seed(0)
+    interpreter = PyTorchInterpreter('.')
+    with redirect_stdout(StringIO()):
+        interpreter(SCRIPT % {'size': batch_size * num_steps, 'batch': batch_size})
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    Exp.EVENT('reset batch')
+    index = CacheIndex(loss_graph)
+    plan = MemoryPlan(index)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for _ in range(num_steps):
+        index.invalidate()
+        loss = loss_graph.get_value()
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+        if release:
+            plan.release()
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return before, after, loss.item(), len(plan.released)
+
+
+def spawn(args, release: bool):
+    command = [sys.executable, '-m', 'benchmarks.memory', '-b', str(args.batch_size), '-s', str(args.num_steps),
+               '--child', 'release' if release else 'plain']
+    before, after, loss, released = subprocess.check_output(command).decode().split()
+    return int(before), int(after), float(loss), int(released)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.memory', usage='%(prog)s [options]')
+    parser.add_argument('-b', '--batch-size', type=int, default=500)
+    parser.add_argument('-s', '--num-steps', type=int, default=10)
+    parser.add_argument('--child', choices=['plain', 'release'], default=None)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(*measure(args.num_steps, args.batch_size, args.child == 'release'))
+        sys.exit(0)
+
+    before, after, loss, _ = spawn(args, False)
+    before_release, after_release, loss_release, released = spawn(args, True)
+    assert loss == loss_release
+    # ru_maxrss is in kilobytes (linux)
+    print('peak RSS while training : %8.1f MB -> %8.1f MB (%d values released)' % (
+        (after - before) / 1024, (after_release - before_release) / 1024, released))
+    print('peak RSS of the process : %8.1f MB -> %8.1f MB' % (after / 1024, after_release / 1024))
@@ -0,0 +1,81 @@
+"""
+    Memory (RSS) and time to the first batch of a saved dataset (.npy), read or mapped into memory.
+
+    $ python -m benchmarks.mmap
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+SCRIPT = 'x = batch(images, %(batch)d)\nprint x'
+
+
+# resident pages (linux) ; the mapped pages are counted once touched
+def _rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+# in a new process (the modules are imported once)
+def measure(args, use_mmap: bool):
+    from mp import PyTorchInterpreter
+
+    before = _rss()
+    begin = perf_counter()
+    interpreter = PyTorchInterpreter(args.dir, use_mmap=use_mmap)
+    with redirect_stdout(StringIO()):
+        interpreter(SCRIPT % {'batch': args.batch_size})
+    batch = interpreter.plan.attr['x'].get_value()
+    first = perf_counter() - begin
+    after = _rss()
+    return after - before, first, float(batch.float().sum())
+
+
+def spawn(args, use_mmap: bool):
+    command = [sys.executable, '-m', 'benchmarks.mmap', '-b', str(args.batch_size), '--dir', args.dir]
+    if use_mmap:
+        command.append('--mmap')
+    rss, first, total = subprocess.check_output(command + ['--child']).decode().split()
+    return int(rss), float(first), float(total)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.mmap', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-images', type=int, default=200000)
+    parser.add_argument('-b', '--batch-size', type=int, default=50)
+    parser.add_argument('-r', '--num-repeats', type=int, default=3)
+    parser.add_argument('--dir')
+    parser.add_argument('--mmap', action='store_true')
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+
+    if args.child:
+        print(*measure(args, args.mmap))
+        sys.exit(0)
+
+    import numpy as np
+    with tempfile.TemporaryDirectory() as args.dir:
+        path = os.path.join(args.dir, 'images.npy')
+        images = np.lib.format.open_memmap(path, 'w+', np.float32, (args.num_images, 1, 28, 28))
+        # by chunks
+        for begin in range(0, args.num_images, 1000):
+            images[begin:begin + 1000] = np.random.rand(*images[begin:begin + 1000].shape)
+        images.flush()
+        del images
+        # alternated (medians) ; the file stays in the page cache
+        read, mapped = [], []
+        for _ in range(args.num_repeats):
+            read.append(spawn(args, False))
+            mapped.append(spawn(args, True))
+            assert read[-1][2] == mapped[-1][2]
+        size = os.path.getsize(path)
+    rss, first, _ = (sorted(values)[len(values) // 2] for values in zip(*read))
+    rss_mmap, first_mmap, _ = (sorted(values)[len(values) // 2] for values in zip(*mapped))
+    print('dataset      : %8.1f MB' % (size / 2 ** 20))
+    print('RSS          : %8.1f MB -> %8.1f MB' % (rss / 2 ** 20, rss_mmap / 2 ** 20))
+    print('first batch  : %8.1f ms -> %8.1f ms (x%.2f)' % (first * 1e3, first_mmap * 1e3, first / first_mmap))
@@ -0,0 +1,48 @@
+"""
+    Throughput of the Pratt parser against the reference parser.
+
+    $ python -m benchmarks.parser
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from mp.core.interpreter import Interpreter
+from mp.core.parser import Parser
+
+
+def _reference(tokens):
+    return Interpreter._semantic_analysis(*Interpreter._parser(tokens))
+
+
+def measure(parser, lines, repeat: int):
+    lines = [Interpreter._scanner(line) for line in lines]
+    begin = perf_counter()
+    for _ in range(repeat):
+        for tokens in lines:
+            parser(tokens)
+    return len(lines) * repeat / (perf_counter() - begin)
+
+
+def arithmetic(width: int):
+    ops = ['+', '*', '-', '/']
+    return 'x = a0' + ''.join(' %s a%d' % (ops[i % len(ops)], i + 1) for i in range(width))
+
+
+def nested(depth: int):
+    return 'x = ' + 'f(a, ' * depth + 'b' + ')' * depth
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.parser', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--num-lines', type=int, default=2000)
+    parser.add_argument('-w', '--width', type=int, default=64)
+    parser.add_argument('-d', '--depth', type=int, default=32)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for name, line in [('arithmetic', arithmetic(args.width)), ('nested calls', nested(args.depth))]:
+        lines = [line] * args.num_lines
+        legacy = measure(_reference, lines, args.repeat)
+        pratt = measure(Parser.parse, lines, args.repeat)
+        print('%-12s legacy parser : %10.0f lines/sec' % (name, legacy))
+        print('%-12s pratt parser  : %10.0f lines/sec (x%.1f)' % (name, pratt, pratt / legacy))
@@ -0,0 +1,65 @@
+"""
+    Training steps of the MNIST convolution script (synthetic data), with and without prefetching the batches.
+
+    $ python -m benchmarks.prefetch
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from benchmarks.compile import SCRIPT
+from mp import PyTorchInterpreter
+from mp.core.attribute import CacheIndex
+from mp.core.expression import Expression as Exp
+from mp.engine.pytorch.framework import torch
+
+SOURCES = {
+    'contiguous': 'randn(%(size)d, 1, 28, 28)',
+    # copied on each batch
+    'strided': 'randn(%(size)d * 2, 1, 28, 28)(::2)',
+}
+
+
+def measure(source: str, num_steps: int, batch_size: int, prefetch: int):
+    torch.manual_seed(0)
+    script = SCRIPT.replace('batch(randn(%(size)d, 1, 28, 28), %(batch)d)',
+                            'batch(%s, %%(batch)d, _prefetch=%d)' % (SOURCES[source], prefetch))
+    interpreter = PyTorchInterpreter('.')
+    with redirect_stdout(StringIO()):
+        interpreter(script % {'size': batch_size * num_steps, 'batch': batch_size})
+    loss_graph = interpreter.plan.attr['loss']
+    optim = interpreter.plan.attr['optim'].get_value()
+    Exp.EVENT('reset batch')
+    index = CacheIndex(loss_graph)
+    begin = perf_counter()
+    for _ in range(num_steps):
+        index.invalidate()
+        loss = loss_graph.get_value()
+        optim.zero_grad()
+        loss.backward()
+        optim.step()
+    return (perf_counter() - begin) / num_steps, loss.item()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.prefetch', usage='%(prog)s [options]')
+    parser.add_argument('-b', '--batch-size', type=int, default=200)
+    parser.add_argument('-s', '--num-steps', type=int, default=20)
+    parser.add_argument('-p', '--prefetch', type=int, default=4)
+    parser.add_argument('-r', '--num-repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print('threads : %d' % torch.get_num_threads())
+    for source in SOURCES.keys():
+        # alternated (medians)
+        plain, prefetched = [], []
+        for _ in range(args.num_repeats):
+            step, loss = measure(source, args.num_steps, args.batch_size, 0)
+            step_prefetch, loss_prefetch = measure(source, args.num_steps, args.batch_size, args.prefetch)
+            assert loss == loss_prefetch
+            plain.append(step)
+            prefetched.append(step_prefetch)
+        plain = sorted(plain)[len(plain) // 2]
+        prefetched = sorted(prefetched)[len(prefetched) // 2]
+        print('%-10s : %8.2f ms -> %8.2f ms (x%.2f)' % (source, plain * 1e3, prefetched * 1e3, plain / prefetched))
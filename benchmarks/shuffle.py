@@ -0,0 +1,46 @@
+"""
+    Shuffled epochs of a synthetic MNIST-sized dataset, by shuffle() (a shuffled copy) and by batch(_shuffle=true).
+
+    $ python -m benchmarks.shuffle
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from mp import PyTorchInterpreter
+from mp.core.expression import Expression as Exp
+from mp.engine.pytorch.framework import torch
+
+SCRIPTS = {
+    'shuffle()': 'x = batch(shuffle(data), %(batch)d)',
+    '_shuffle': 'x = batch(data, %(batch)d, _shuffle=true)',
+}
+
+
+def measure(name: str, size: int, batch_size: int, num_epochs: int):
+    torch.manual_seed(0)
+    interpreter = PyTorchInterpreter('.')
+    with redirect_stdout(StringIO()):
+        interpreter(('data = rand(%(size)d, 784)\n' + SCRIPTS[name] + '\nprint x') % {'size': size, 'batch': batch_size})
+    x = interpreter.plan.attr['x'].toward
+    begin = perf_counter()
+    for _ in range(num_epochs):
+        Exp.EVENT('reset batch')
+        while any(Exp.EVENT('has next batch')):
+            x.get_value().sum()
+    return (perf_counter() - begin) / num_epochs
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmarks.shuffle', usage='%(prog)s [options]')
+    parser.add_argument('-n', '--size', type=int, default=60000)
+    parser.add_argument('-b', '--batch-size', type=int, default=50)
+    parser.add_argument('-e', '--num-epochs', type=int, default=5)
+    args = parser.parse_args()
+
+    # the dataset (float32) or the indices (int64) on each epoch
+    copied = {'shuffle()': args.size * 784 * 4, '_shuffle': args.size * 8}
+    for name in SCRIPTS.keys():
+        epoch = measure(name, args.size, args.batch_size, args.num_epochs)
+        print('%-10s : epoch %8.1f ms / copied %8.1f MB' % (name, epoch * 1e3, copied[name] / 2 ** 20))
@@ -13,8 +13,15 @@ if __name__ == '__main__':
                         action='store_true')
     parser.add_argument('-c,', '--use-cuda', help='Use the CUDA acceleration driver instead of the CPU. (default: False)',
                         action='store_true')
+    parser.add_argument('--compile', help='Run the training steps by torch.compile. (default: False)',
+                        action='store_true')
+    parser.add_argument('--autocast', help='Run the forward passes of training in bfloat16. (default: False)',
+                        action='store_true')
+    parser.add_argument('--mmap', help='Map the binary files into memory instead of reading them. (default: False)',
+                        action='store_true')
     args = parser.parse_args()
 
     interpreter = find_interpreter(args.interpreter)
-    cmd = interpreter(dir_process=args.dir_process, use_cuda=args.use_cuda)
+    cmd = interpreter(dir_process=args.dir_process, use_cuda=args.use_cuda, use_compile=args.compile,
+                      use_autocast=args.autocast, use_mmap=args.mmap)
     cmd.begin_interactive(debug=args.debug)
@@ -8,11 +8,15 @@ class Attr:
     def __init__(self, name: str, toward=None):
         self.name = name
         self._toward = toward
-        self.code = None
+        # data node and its digest (when calculated)
+        self.source = None
+        self.digest = None
         self.value = None
 
         self.is_attr = True
         self.fixed = False
+        # used by several parents (keep the value until remove_cache)
+        self.shared = False
 
         # callable or constant
         self.is_data = True
@@ -34,6 +38,17 @@ class Attr:
                 self.value = None
                 self.toward.remove_cache()
 
+    # remove_cache without visiting the children
+    def clear_value(self):
+        if self.toward is not None:
+            if not self.toward.fixed:
+                self.value = None
+
+    # source code (for saving)
+    @property
+    def code(self):
+        return self.source.encode() if self.source is not None else None
+
     @property
     def symbol(self):
         if self.name.startswith('/'):
@@ -57,6 +72,16 @@ class Attr:
     def reusable(self):
         return self.value is not None
 
+    # events called while calculating (None if unknown)
+    @property
+    def event_names(self):
+        return None
+
+    # attributes needed to calculate
+    @property
+    def children(self):
+        return [self.toward] if self.toward is not None else []
+
     def _calculate(self):
         if not self.is_data:
             raise NotDataError(self.symbol)
@@ -92,6 +117,13 @@ class AttrConst(Attr):
     def remove_cache(self):
         pass
 
+    def clear_value(self):
+        pass
+
+    @property
+    def children(self):
+        return []
+
     @toward.setter
     def toward(self, toward):
         raise ConstError()
@@ -120,6 +152,10 @@ class AttrTuple(Attr):
     def get_value(self):
         return [self.ATTR.to_value(arg) for arg in self.list]
 
+    @property
+    def children(self):
+        return [arg for arg in self.list if arg is not None]
+
     def remove_cache(self):
         for arg in self.list:
             if arg is not None:
@@ -179,6 +215,9 @@ class AttrOP(Attr):
     def __init__(self, op: str, args):
         super().__init__(op)
         self.args = args
+        # builtin bound once (None if slicing)
+        delegate = self.MAP_OP.get(op)
+        self.method = Exp.EVENT.bind(delegate.name) if delegate is not None else None
 
     @property
     def symbol(self):
@@ -190,13 +229,30 @@ class AttrOP(Attr):
 
     @property
     def reusable(self):
-        return False
+        return self.shared and self.value is not None
+
+    @property
+    def event_names(self):
+        if self.op in self.MAP_OP.keys():
+            return self.MAP_OP[self.op].name,
+        if self.op in Exp.IDX:
+            return '__reduce_slice',
+        return None
+
+    @property
+    def children(self):
+        return self.args.children
 
     def remove_cache(self):
+        self.clear_value()
         for arg in self.args.list:
             if arg is not None:
                 arg.remove_cache()
 
+    def clear_value(self):
+        if self.shared:
+            self.value = None
+
     def _calculate(self):
         if self.op in self.MAP_OP.keys():
             args = self.args.get_value()
@@ -210,7 +266,7 @@ class AttrOP(Attr):
                     raise NotDataError(var_arg.symbol)
             # check type (unexpected)
             try:
-                return self.MAP_OP[self.op](*args)
+                return self.method(*args)
             except TypeError as e:
                 raise _TypeError(str(e))
         if self.op in Exp.IDX:
@@ -231,6 +287,10 @@ class AttrShell(AttrOP):
     def symbol(self):
         return self.sub.symbol
 
+    @property
+    def children(self):
+        return [self.sub] + self.args.children
+
     def remove_cache(self):
         self.sub.remove_cache()
         super().remove_cache()
@@ -246,6 +306,10 @@ class AttrTranspose(AttrShell):
     def __init__(self, sub, args):
         super().__init__(Exp.SHELL_AA[0], sub, args)
 
+    @property
+    def event_names(self):
+        return '__reduce_dim', '__reduce_sizeof', '__reduce_transpose'
+
     def _calculate(self):
         args = self.args.copy()
         # dim
@@ -279,6 +343,15 @@ class AttrIndexed(AttrShell):
     def __init__(self, sub: Attr, args):
         super().__init__(Exp.SHELL_RR[0], sub, args)
 
+    @property
+    def event_names(self):
+        # if method delegate
+        if getattr(self.sub, 'is_pointer', False):
+            return None
+        if len(self.args) == 0:
+            return 'copy',
+        return '__reduce_dim', '__reduce_indexed'
+
     def _calculate(self):
         # if method delegate
         if hasattr(self.sub, 'is_pointer'):
@@ -323,6 +396,10 @@ class AttrView(AttrShell):
     def __init__(self, sub: Attr, args):
         super().__init__(Exp.SHELL_SS[0], sub, args)
 
+    @property
+    def event_names(self):
+        return '__reduce_view',
+
     def _calculate(self):
         return self._calculate_view(self.sub, self.args)
 
@@ -343,7 +420,7 @@ class AttrMethod(Attr):
 
         self.plan = plan
 
-        self.code = toward.encode()
+        self.source = toward
         self.repeat = repeat
 
     @property
@@ -352,18 +429,35 @@ class AttrMethod(Attr):
 
     @property
     def reusable(self):
-        return super().reusable and self.fixed
+        return super().reusable and (self.fixed or self.shared)
 
     @property
     def is_pointer(self):
         return self.args is None
 
+    @property
+    def event_names(self):
+        if self.is_pointer or self.repeat is not None:
+            return None
+        return self.method.name,
+
+    @property
+    def children(self):
+        if self.is_pointer:
+            return []
+        return self.args.children + [arg for arg in self.kwargs.dict.values() if arg is not None]
+
     def remove_cache(self):
+        self.clear_value()
         if self.args is not None and not self.fixed:
             for arg in self.args.list:
                 if arg is not None:
                     arg.remove_cache()
 
+    def clear_value(self):
+        if self.shared:
+            self.value = None
+
     def _calculate(self):
         # if pointing method
         if self.is_pointer:
@@ -398,7 +492,16 @@ class AttrIteration(AttrMethod):
         self.placeholders = placeholders
         self.args_bak = None
 
+    @property
+    def event_names(self):
+        return None
+
+    @property
+    def children(self):
+        return [self.method] + self.args.children
+
     def remove_cache(self):
+        self.clear_value()
         self.method.remove_cache()
         for arg in self.placeholders.list + self.args.list:
             if arg is not None:
@@ -461,4 +564,138 @@ class AttrDict:
         return Attr(key)
 
 
+class CacheIndex:
+    # attributes without values of their own
+    HOLDERS = (Attr, AttrTuple)
+
+    def __init__(self, root: Attr):
+        self.root = root
+        # id -> attribute, id -> parents
+        self.nodes = dict()
+        self.parents = dict()
+        # bodies of user-defined methods (called with other placeholders)
+        self.bodies = set()
+        self._index(root)
+
+        dirty = self._find_dirty()
+        # cleared on each step
+        self.dirty = [node for key, node in self.nodes.items() if key in dirty]
+        # kept until remove_cache
+        self.kept = 0
+        for key, node in self.nodes.items():
+            if key in dirty or key in self.bodies or not self._is_computed(node) or node.fixed:
+                continue
+            node.shared = True
+            self.kept += 1
+
+    def invalidate(self):
+        for node in self.dirty:
+            node.clear_value()
+
+    # dirty attributes needed to calculate the root
+    def dirty_under(self, root):
+        found = self._subtree(root)
+        return [node for node in self.dirty if id(node) in found]
+
+    def _index(self, root):
+        self.nodes[id(root)] = root
+        stack = [root]
+        while len(stack) > 0:
+            node = stack.pop()
+            for child in node.children:
+                key = id(child)
+                self.parents.setdefault(key, []).append(node)
+                if key not in self.nodes:
+                    self.nodes[key] = child
+                    stack.append(child)
+        for node in list(self.nodes.values()):
+            if type(node) is AttrIteration:
+                self.bodies.update(self._subtree(node.method))
+
+    def _subtree(self, root):
+        found = {id(root)}
+        stack = [root]
+        while len(stack) > 0:
+            for child in stack.pop().children:
+                if id(child) not in found:
+                    found.add(id(child))
+                    stack.append(child)
+        return found
+
+    def _find_dirty(self):
+        # values changed between steps (and values changed with them in place)
+        changed = set()
+        for node in self.nodes.values():
+            if self._is_volatile(node):
+                changed.add(id(node))
+                if node.fixed:
+                    changed.update(self._subtree(node))
+        # everything calculated from them
+        dirty = set()
+        stack = [self.nodes[key] for key in changed]
+        while len(stack) > 0:
+            node = stack.pop()
+            if id(node) in dirty:
+                continue
+            dirty.add(id(node))
+            stack.extend(self.parents.get(id(node), ()))
+        # method bodies are shared by every call (the other calls keep their values)
+        for key in list(dirty):
+            node = self.nodes[key]
+            if type(node) is AttrIteration:
+                dirty.update(self._subtree(node.method))
+        return dirty
+
+    @classmethod
+    def _is_computed(cls, node):
+        return not node.is_constant and type(node) not in cls.HOLDERS
+
+    @classmethod
+    def _is_volatile(cls, node):
+        if not cls._is_computed(node):
+            return False
+        if type(node) is AttrIteration:
+            return node.repeat is not None
+        # method delegates are resolved while calculating
+        if isinstance(getattr(node, 'sub', None), AttrMethod):
+            return True
+        names = node.event_names
+        if names is None:
+            return True
+        for name in names:
+            event = Exp.EVENT.find_unique(name, True)
+            if event is None:
+                return True
+            if node.fixed:
+                if event.volatile:
+                    return True
+            elif not event.pure:
+                return True
+        return False
+
+
+class MemoryPlan:
+    def __init__(self, index: CacheIndex):
+        self.index = index
+        dirty = {id(node) for node in index.dirty}
+        # values not read after the step (the loss is kept)
+        self.released = [node for key, node in index.nodes.items()
+                         if node is not index.root and self._is_dead(node, key in dirty)]
+
+    # after backward
+    def release(self):
+        for node in self.released:
+            node.value = None
+
+    @classmethod
+    def _is_dead(cls, node, dirty: bool) -> bool:
+        if node.is_constant or node.fixed or type(node) is AttrTuple:
+            return False
+        # calculated again on the next step
+        if type(node) is Attr:
+            return dirty and (node.toward is None or not node.toward.fixed)
+        # the others are never reused
+        return dirty or not node.shared
+
+
 attr_classes = (Attr, AttrConst, AttrIndexed, AttrIteration, AttrMethod, AttrOP, AttrTranspose, AttrTuple, AttrView)
@@ -4,6 +4,6 @@ from mp.core import extension as _ext
 @_ext.static('trace')
 def method_trace(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1, +1)
-    plan.event('init monitor', args)
+    plan.event('init monitor', args, kwargs)
     loss = plan.event('begin training')
     return loss
@@ -4,21 +4,24 @@ __all__ = ['extension', ]
 
 
 class extension:
-    def __new__(cls, regex: str, fixed: bool = False, hidden: bool = False):
-        return _ExtensionWrapper(regex, fixed, hidden)
+    def __new__(cls, regex: str, fixed: bool = False, hidden: bool = False, pure: bool = False,
+                volatile: bool = False):
+        return _ExtensionWrapper(regex, fixed, hidden, pure, volatile)
 
     # In case of not using regular expressions
     @classmethod
-    def static(cls, var_name: str, fixed: bool = False, hidden: bool = False):
+    def static(cls, var_name: str, fixed: bool = False, hidden: bool = False, pure: bool = False,
+               volatile: bool = False):
         var_name = var_name.replace(' ', '')
         regex = r'^%s$' % var_name
-        return _ExtensionWrapper(regex, fixed, hidden)
+        return _ExtensionWrapper(regex, fixed, hidden, pure, volatile)
 
     @classmethod
-    def header(cls, header: str, fixed: bool = False, hidden: bool = False):
+    def header(cls, header: str, fixed: bool = False, hidden: bool = False, pure: bool = False,
+               volatile: bool = False):
         var_name = header.replace(' ', '')
         regex = r'^%s[.].*' % var_name
-        return _ExtensionWrapper(regex, fixed, hidden)
+        return _ExtensionWrapper(regex, fixed, hidden, pure, volatile)
 
     # For custom dataset
     @classmethod
@@ -34,13 +37,15 @@ class extension:
     def binary(cls, name: str, op, scope):
         def wrapper(x, y, _=None):
             return op(x, y)
-        method = cls.static(name)(wrapper)
+        # called directly by the compiled graphs
+        wrapper.op = op
+        method = cls.static(name, pure=True)(wrapper)
         scope['method_%s' % name[2:]] = method
 
 
 class _ExtensionWrapper:
-    def __init__(self, regex: str, fixed: bool, hidden: bool):
-        self._unit = EventUnit(regex, None, True, fixed, hidden, is_regex=True)
+    def __init__(self, regex: str, fixed: bool, hidden: bool, pure: bool = False, volatile: bool = False):
+        self._unit = EventUnit(regex, None, True, fixed, hidden, is_regex=True, pure=pure, volatile=volatile)
         self._attr = dict()
 
     def add_attr(self, key, value):
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        # drop the least recently used
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return 'LRUCache(size=%d/%d, hits=%d, misses=%d)' % (len(self), self.maxsize, self.hits, self.misses)
@@ -0,0 +1,281 @@
+import hashlib
+
+from mp.core.attribute import Attr, AttrConst, AttrDict, AttrIndexed, AttrIteration, AttrMethod, AttrOP, \
+    AttrTranspose, AttrTuple, AttrView, CacheIndex, attr_classes
+from mp.core.cache import LRUCache
+from mp.core.expression import Expression as Exp
+
+
+class _Fallback(Exception):
+    pass
+
+
+class CompiledGraph:
+    # source hash -> code (shared by the graphs of the same structure)
+    CACHE = LRUCache(256)
+    INDENT = ' ' * 8
+
+    def __init__(self, root: Attr, index: CacheIndex = None, inputs=()):
+        self.root = root
+        self.index = CacheIndex(root) if index is None else index
+        # attributes given as the arguments
+        self.inputs = list(inputs)
+        self.source = None
+        self.digest = None
+        # attributes calculated by the generated code, and by the interpreter
+        self.compiled = 0
+        self.fallbacks = 0
+        # arguments filled on each step
+        self.holders = []
+
+        self._events = None
+        self._generation = -1
+        self._function = None
+        self.compile()
+
+    def __call__(self, *inputs):
+        return self.function(*inputs)
+
+    @property
+    def function(self):
+        # builtins are bound on compile
+        if self._events is not Exp.EVENT or self._events._generation != self._generation:
+            self.compile()
+        return self._function
+
+    def compile(self):
+        self._lines = []
+        self._objects = []
+        self._names = dict()
+        self._constants = dict()
+        self._memo = dict()
+        self._memo_log = []
+        self._free = dict()
+        self._dirty = {id(node) for node in self.index.dirty}
+        self._placeholders = {id(arg) for node in self.index.nodes.values() if type(node) is AttrIteration
+                              for arg in node.placeholders.list if arg is not None}
+        self._inputs = {id(node): 'i%d' % i for i, node in enumerate(self.inputs)}
+        self.compiled = 0
+        self.fallbacks = 0
+        self.holders = []
+
+        result = self._emit(self.root, {})
+        if type(self.root) is Attr:
+            self._line('%s.value = %s' % (self._object(self.root), result))
+        self._line('return %s' % result)
+
+        self.source = self._build_source()
+        self.digest = hashlib.sha1(self.source.encode()).hexdigest()
+        code = self.CACHE.get(self.digest)
+        if code is None:
+            code = compile(self.source, '<mp graph %s>' % self.digest[:8], 'exec')
+            self.CACHE.set(self.digest, code)
+        scope = dict()
+        exec(code, scope)
+        self._function = scope['__mp_build']([obj for name, obj in self._objects])
+        # the builtins may be registered while calculating the constants
+        self._events = Exp.EVENT
+        self._generation = Exp.EVENT._generation
+        del self._lines, self._objects, self._names, self._constants, self._memo, self._memo_log, self._free, \
+            self._inputs
+        return self._function
+
+    def _build_source(self):
+        lines = ['def __mp_build(objects):']
+        if len(self._objects) > 0:
+            lines.append('    %s, = objects' % ', '.join(name for name, obj in self._objects))
+        lines.append('    def __mp_graph(%s):' % ', '.join(self._inputs.values()))
+        lines += self._lines
+        lines.append('    return __mp_graph')
+        return '\n'.join(lines) + '\n'
+
+    def _line(self, line: str):
+        self._lines.append(self.INDENT + line)
+
+    def _local(self):
+        return 'v%d' % len(self._lines)
+
+    def _object(self, obj, prefix: str = 'n'):
+        name = self._names.get(id(obj))
+        if name is None:
+            name = '%s%d' % (prefix, len(self._objects))
+            self._names[id(obj)] = name
+            self._objects.append((name, obj))
+            if prefix == 'c':
+                self._constants[name] = obj
+        return name
+
+    # placeholders needed to calculate (bound by the calls)
+    def _free_of(self, node):
+        key = id(node)
+        free = self._free.get(key)
+        if free is None:
+            if key in self._placeholders:
+                free = key,
+            elif type(node) is AttrIteration:
+                bound = {id(arg) for arg in node.placeholders.list}
+                free = {p for p in self._free_of(node.method) if p not in bound}
+                free.update(p for arg in node.args.children for p in self._free_of(arg))
+                free = tuple(sorted(free))
+            else:
+                free = tuple(sorted({p for child in node.children for p in self._free_of(child)}))
+            self._free[key] = free
+        return free
+
+    def _emit(self, node, context: dict) -> str:
+        if node is None:
+            return 'None'
+        if type(node) not in attr_classes:
+            return self._object(node, 'c')
+        free = self._free_of(node)
+        key = (id(node),) + tuple(context.get(p) for p in free)
+        expr = self._memo.get(key)
+        if expr is None:
+            expr = self._emit_node(node, context, free)
+            self._memo[key] = expr
+            self._memo_log.append(key)
+        return expr
+
+    def _emit_node(self, node, context: dict, free: tuple) -> str:
+        t = type(node)
+        if t is AttrConst:
+            return self._object(node.value, 'c')
+        if t is Attr and id(node) in context:
+            return context[id(node)]
+        if id(node) in self._inputs:
+            return self._inputs[id(node)]
+        # unchanged between steps
+        if len(free) == 0 and (id(node) not in self._dirty or node.fixed):
+            return self._object(node.get_value(), 'c')
+
+        if t is Attr:
+            if node.toward is None:
+                return self._fallback(node, free)
+            return self._emit(node.toward, context)
+        if t is AttrTuple:
+            items = [self._emit(arg, context) for arg in node.list]
+            return self._assign('[%s]' % ', '.join(items))
+        if t is AttrOP:
+            if node.op in AttrOP.MAP_OP.keys():
+                return self._emit_op(node, context)
+            if node.op in Exp.IDX:
+                return self._emit_call(Exp.EVENT.bind('__reduce_slice'), None, node.args.list, None, context)
+        if t is AttrView:
+            return self._emit_call(Exp.EVENT.bind('__reduce_view'), None, [node.sub] + node.args.list, None, context)
+        if t is AttrTranspose:
+            if len(node.args) == 0:
+                return self._emit_call(Exp.EVENT.bind('__reduce_dim'), None, [node.sub], None, context)
+            if len(node.args) == 1:
+                args = [node.sub] + node.args.list[:1]
+                return self._emit_call(Exp.EVENT.bind('__reduce_sizeof'), None, args, None, context)
+            args = [node.sub] + node.args.list
+            return self._emit_call(Exp.EVENT.bind('__reduce_transpose'), None, args, None, context)
+        # method delegates are resolved by the interpreter
+        if t is AttrIndexed and not isinstance(node.sub, AttrMethod):
+            if len(node.args) == 0:
+                return self._emit_call(Exp.EVENT.bind('copy'), None, [node.sub], None, context)
+            args = [node.sub] + node.args.list
+            return self._emit_call(Exp.EVENT.bind('__reduce_indexed'), None, args, None, context)
+        if t is AttrMethod and self._is_pure(node):
+            return self._emit_call(node.method, node.toward, node.args.list, node.kwargs.dict, context, node.plan)
+        if t is AttrIteration and node.repeat is None:
+            return self._emit_iteration(node, context, free)
+        return self._fallback(node, free)
+
+    def _emit_op(self, node, context: dict) -> str:
+        args = [self._emit(arg, context) for arg in node.args.list[:2]]
+        self.compiled += 1
+        method = node.method.target()
+        # the operator itself (binary builtins)
+        if hasattr(method, 'op'):
+            return self._assign('%s(%s)' % (self._object(method.op, 'f'), ', '.join(args)))
+        if method is None:
+            method = node.method
+        return self._assign('%s(%s)' % (self._object(method, 'f'), ', '.join(args)), method is not node.method)
+
+    def _emit_call(self, method, toward, args: list, kwargs, context: dict, plan=None) -> str:
+        # the builtins get the values by the constant attributes
+        values = [self._emit(arg, context) for arg in args]
+        holders = [AttrConst(None) if arg is not None else None for arg in args]
+        name = getattr(method, 'name', None)
+        for holder, value in zip(holders, values):
+            if holder is not None:
+                self._fill(holder, value, name)
+        kwargs_holders = dict()
+        for key, arg in (kwargs or {}).items():
+            if arg is not None:
+                kwargs_holders[key] = AttrConst(None)
+                self._fill(kwargs_holders[key], self._emit(arg, context), name)
+        self.compiled += 1
+        target = getattr(method, 'target', None)
+        target = target() if target is not None else None
+        call = '%s(%s, %s, %s, %s)' % (
+            self._object(target if target is not None else method, 'f'),
+            self._object(plan, 'c'), self._object(toward, 'c'),
+            self._object(AttrTuple(holders), 'c'), self._object(AttrDict(kwargs_holders), 'c'),
+        )
+        return self._assign(call, target is not None)
+
+    def _fill(self, holder, value: str, name: str):
+        # the constants are filled once
+        if value in self._constants:
+            holder.value = self._static(name, self._constants[value])
+        else:
+            self._line('%s.value = %s' % (self._object(holder, 'h'), value))
+            self.holders.append(holder)
+
+    def _emit_iteration(self, node, context: dict, free: tuple) -> str:
+        n_lines = len(self._lines)
+        n_memo = len(self._memo_log)
+        compiled = self.compiled
+        inner = dict()
+        for placeholder, arg in zip(node.placeholders.list, node.args.list):
+            inner[id(placeholder)] = self._emit(arg, context)
+        try:
+            return self._emit(node.method, inner)
+        # the body needs the interpreter
+        except _Fallback:
+            del self._lines[n_lines:]
+            for key in self._memo_log[n_memo:]:
+                del self._memo[key]
+            del self._memo_log[n_memo:]
+            self.compiled = compiled
+            return self._fallback(node, free)
+
+    def _assign(self, expr: str, not_none: bool = False) -> str:
+        name = self._local()
+        self._line('%s = %s' % (name, expr))
+        # the unique builtins return an empty list instead of None
+        if not_none:
+            self._line('if %s is None: %s = []' % (name, name))
+        return name
+
+    def _fallback(self, node, free: tuple) -> str:
+        # the placeholders are bound while calculating the calls only
+        if len(free) > 0:
+            raise _Fallback()
+        self.fallbacks += 1
+        dirty = self.index.dirty_under(node)
+        if len(dirty) > 0:
+            self._line('for node in %s: node.clear_value()' % self._object(dirty, 'c'))
+        return self._assign('%s.get_value()' % self._object(node))
+
+    # drop the arguments of the last step
+    def release(self):
+        for holder in self.holders:
+            holder.value = None
+
+    # constant arguments of the builtins (specialized by the engines)
+    @classmethod
+    def _static(cls, name: str, value):
+        return value
+
+    @classmethod
+    def _is_pure(cls, node) -> bool:
+        if node.is_pointer or node.repeat is not None:
+            return False
+        event = Exp.EVENT.find_unique(node.event_names[0], True)
+        return event is not None and event.pure
+
+    def __repr__(self):
+        return 'CompiledGraph(digest=%s, compiled=%d, fallbacks=%d)' % (self.digest[:8], self.compiled, self.fallbacks)
@@ -1,7 +1,28 @@
+from itertools import count as _count
+from weakref import WeakSet
+
+from mp.core.cache import LRUCache
 from mp.core.expression import Expression as Exp
 
 
 class Variable:
+    # fields linking to the other nodes (changes are reported to the owning graph)
+    STRUCTURE = frozenset(['name', 'toward', 'sub', 'obj', 'step', 'args', 'kwargs', 'repeat'])
+    # fields changing the source code
+    SOURCE = STRUCTURE | frozenset(['num_type', 'value', 'is_pointer_orient', 'is_placeholder', 'is_builtins',
+                                    'is_method_delegate', 'is_method_defined', 'bracket_open', 'bracket_close'])
+    FLAGS = ('is_pointer_orient', 'is_placeholder', 'is_builtins', 'is_method_delegate', 'is_method_defined')
+
+    # structure -> digest (evicted ones get new digests)
+    DIGESTS = LRUCache(maxsize=1 << 20)
+    _DIGEST_IDS = _count(1)
+    _digest = None
+    # nodes whose digests were computed from this one
+    _dependents = None
+    # not copied (the dependents of the copy are unknown)
+    CACHES = frozenset(['_digest', '_dependents'])
+    # weak reference to the graph indexing the node
+    _owner = None
 
     def __init__(self, name: str = None, toward=None):
         self.name = name
@@ -36,6 +57,16 @@ class Variable:
         # repeat call
         self.repeat = None
 
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        if key in Variable.SOURCE:
+            if self._digest is not None:
+                self._invalidate()
+            if key in Variable.STRUCTURE and self._owner is not None:
+                owner = self._owner()
+                if owner is not None:
+                    owner.notify(self)
+
     def has_attr(self, name: str):
         if self.name == name:
             return True
@@ -43,9 +74,74 @@ class Variable:
             return self.toward.has_attr(name)
         return False
 
+    # linked nodes
+    def neighbors(self):
+        for node in (self.toward, self.sub, self.obj, self.step, self.repeat):
+            if node is not None:
+                yield node
+        for node in self.args or ():
+            if node is not None:
+                yield node
+        for node in self.kwargs.values():
+            if node is not None:
+                yield node
+
+    # same digests, same source code (instead of comparing encode())
+    @property
+    def digest(self) -> int:
+        if self._digest is None:
+            key = self._structure()
+            digest = Variable.DIGESTS.get(key)
+            if digest is None:
+                digest = next(Variable._DIGEST_IDS)
+                Variable.DIGESTS.set(key, digest)
+            self._digest = digest
+            for node in self.neighbors():
+                if node._dependents is None:
+                    node._dependents = WeakSet()
+                node._dependents.add(self)
+        return self._digest
+
+    # drop the digests of the node and its ancestors (the others are kept)
+    def _invalidate(self):
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            # the ancestors of a node without digest have no digests
+            if node._digest is None:
+                continue
+            node._digest = None
+            if node._dependents is not None:
+                stack.extend(node._dependents)
+                node._dependents.clear()
+
+    def _structure(self):
+        nodes = tuple(self._digest_of(node) for node in (self.toward, self.sub, self.obj, self.step, self.repeat))
+        args = tuple(self._digest_of(arg) for arg in self.args or ())
+        kwargs = tuple((key, self._digest_of(value)) for key, value in self.kwargs.items())
+        flags = tuple(getattr(self, flag) for flag in self.FLAGS)
+        shell = getattr(self, 'bracket_open', None), getattr(self, 'bracket_close', None)
+        return type(self).__name__, self._symbol_or_none(), flags, shell, nodes, args, kwargs
+
+    # generated names are not a part of the source code
+    def _symbol_or_none(self):
+        if self._name_is_constant():
+            return None
+        if self.name.startswith(Exp.CODE_PARAM):
+            return self.symbol
+        return self.name
+
+    @staticmethod
+    def _digest_of(self):
+        if self is None:
+            return None
+        return self.digest
+
     def copy(self, recursive: bool = False):
         new_var = self.__class__()
         for key, value in self.__dict__.items():
+            if key in Variable.CACHES:
+                continue
             if recursive and value is not None:
                 value = self._copy_recursive(value)
             setattr(new_var, key, value)
@@ -163,6 +259,9 @@ class Constant(Variable):
     def replace(self, name: str, value=None):
         return self
 
+    def _structure(self):
+        return type(self).__name__, self.encode()
+
     @property
     def symbol(self):
         return str(self.value)
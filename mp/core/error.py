@@ -70,3 +70,8 @@ class NotInCandidate(BaseError):
         for name in candidates:
             msg += '\n\t%s' % name
         super().__init__(0x51, msg)
+
+
+class NotExportableError(BaseError):
+    def __init__(self, wrong_token: str):
+        super().__init__(0x60, '\'%s\' cannot be exported without the interpreter.' % wrong_token)
@@ -1,16 +1,22 @@
 import re as _re
 
+from mp.core.cache import LRUCache
 from mp.core.expression import Expression as Exp
 
 
 class EventUnit:
-    def __init__(self, event_name: str, method, unique, fixed, hidden, is_regex: bool = False):
+    def __init__(self, event_name: str, method, unique, fixed, hidden, is_regex: bool = False, pure: bool = False,
+                 volatile: bool = False):
         self._event_name = event_name
         self._event_name_compiled = _re.compile(self._event_name) if is_regex else None
         self._method = method
         self._unique = unique
         self._fixed = fixed
         self._hidden = hidden
+        # same arguments, same result (without side effects)
+        self._pure = pure
+        # kept, but changed in place between steps (trainable weights)
+        self._volatile = volatile
 
     def match_name(self, name: str, hidden: bool = False):
         if self._hidden and not hidden:
@@ -36,6 +42,14 @@ class EventUnit:
     def hidden(self) -> bool:
         return self._hidden
 
+    @property
+    def pure(self) -> bool:
+        return self._pure
+
+    @property
+    def volatile(self) -> bool:
+        return self._volatile
+
     @property
     def unique(self) -> bool:
         return self._unique
@@ -44,6 +58,16 @@ class EventUnit:
     def name(self) -> str:
         return self._event_name
 
+    # the only matching name (None if any other)
+    @property
+    def literal(self):
+        if self._event_name_compiled is None:
+            return self._event_name
+        pattern = self._event_name
+        if pattern.startswith('^') and pattern.endswith('$') and _re.escape(pattern[1:-1]) == pattern[1:-1]:
+            return pattern[1:-1]
+        return None
+
     def __str__(self):
         return self.name
 
@@ -57,46 +81,99 @@ class EventDelegate:
         kwargs['hidden'] = self._hidden
         return Exp.EVENT(self._event_name, *args, **kwargs)
 
+    @property
+    def name(self) -> str:
+        return self._event_name
+
+
+class EventBinding(EventDelegate):
+    def __init__(self, events, event_name: str, hidden: bool):
+        super().__init__(event_name, hidden)
+        self._events = events
+        # last seen change of the events, and of the name
+        self._generation = -1
+        self._generation_name = -1
+        self._resolved = ()
+
+    def __call__(self, *args, **kwargs):
+        if self._events._generation != self._generation:
+            self._update()
+        return self._events._dispatch(self._resolved, args, kwargs)
+
+    # the only method called (None if dispatched to several units)
+    def target(self):
+        if self._events._generation != self._generation:
+            self._update()
+        if len(self._resolved) == 1 and self._resolved[0][1].unique:
+            return self._resolved[0][1].get_method()
+        return None
+
+    # resolved again only if the name is registered again
+    def _update(self):
+        events = self._events
+        generation = events.generation(self._event_name)
+        if generation != self._generation_name:
+            self._resolved = events._resolve(self._event_name, self._hidden)
+            self._generation_name = generation
+        self._generation = events._generation
+
 
 class Event:
+    # resolved names kept in memory
+    RESOLVED_CACHE_SIZE = 4096
+
     def __init__(self, verbose: bool = False):
-        self._events = list()
+        # order -> unit
+        self._events = dict()
         self._uniques = dict()
         self._verbose = verbose
+        self._order = 0
+        # registered name -> orders (for remove)
+        self._names = dict()
+        # static name -> orders
+        self._static = dict()
+        # the other patterns, prefiltered by the alternation of the ones without groups
+        self._regex = dict()
+        self._regex_any = None
+        # (name, hidden) -> matching units (cleared on add / remove)
+        self._resolved = LRUCache(self.RESOLVED_CACHE_SIZE)
+        # static name -> last change (the other patterns change every name)
+        self._generation = 0
+        self._generations = dict()
+        self._regex_generation = 0
 
     def add(self, event_name: str, method, unique: bool = False,
-            fixed: bool = False, hidden: bool = False, is_regex: bool = False):
-        event = EventUnit(event_name, method, unique, fixed, hidden, is_regex)
+            fixed: bool = False, hidden: bool = False, is_regex: bool = False, pure: bool = False,
+            volatile: bool = False):
+        event = EventUnit(event_name, method, unique, fixed, hidden, is_regex, pure, volatile)
         if unique:
             self.remove(event_name)
             self._uniques[event_name] = event
-        self._events.append(event)
+        self._register(event)
 
     def add_object(self, unit: EventUnit):
         assert type(unit) is EventUnit
         if unit._unique:
             self.remove(unit._event_name)
             self._uniques[unit._event_name] = unit
-        self._events.append(unit)
+        self._register(unit)
 
     def find(self, event_name: str, hidden: bool = False, get_idx: bool = False, _no_re: bool = False):
-        def _compare():
-            if _no_re:
-                return event._event_name == event_name
-            return event.match_name(event_name, hidden)
-
-        for idx, event in enumerate(self._events):
-            if _compare():
-                if get_idx:
-                    return idx, event
-                return event
+        if _no_re:
+            orders = self._names.get(event_name)
+            if orders:
+                order = orders[0]
+                return (order, self._events[order]) if get_idx else self._events[order]
+        else:
+            for order, event in self._resolve(event_name, hidden):
+                return (order, event) if get_idx else event
         if get_idx:
             return -1, None
         return None
 
     def find_unique(self, event_name: str, hidden: bool = False):
-        for event in self._uniques.values():
-            if event.match_name(event_name, hidden):
+        for order, event in self._resolve(event_name, hidden):
+            if event.unique and self._uniques.get(event._event_name) is event:
                 return event
         return None
 
@@ -105,18 +182,93 @@ class Event:
         if event_name in self._uniques.keys():
             del self._uniques[event_name]
         if idx >= 0:
-            del self._events[idx]
+            self._unregister(idx, event)
 
     def __call__(self, event_name: str, *args, hidden: bool = False, **kwargs):
+        return self._dispatch(self._resolve(event_name, hidden), args, kwargs)
+
+    # bind the name to the events (instead of delegate)
+    def bind(self, event_name: str, hidden: bool = False):
+        return EventBinding(self, event_name, hidden)
+
+    def generation(self, event_name: str) -> int:
+        return max(self._generations.get(event_name, 0), self._regex_generation)
+
+    @classmethod
+    def _dispatch(cls, events, args, kwargs):
         list_responses = list()
-        for event in self._events:
-            if event.match_name(event_name, hidden):
-                response = event(*args, **kwargs)
-                self._add_response(list_responses, response)
-                if response is not None and event.unique:
-                    return list_responses[-1]
+        for order, event in events:
+            response = event(*args, **kwargs)
+            cls._add_response(list_responses, response)
+            if response is not None and event.unique:
+                return list_responses[-1]
         return list_responses
 
+    def _register(self, event: EventUnit):
+        order = self._order
+        self._order += 1
+        self._events[order] = event
+        self._names.setdefault(event._event_name, []).append(order)
+        literal = event.literal
+        if literal is not None:
+            self._static.setdefault(literal, []).append(order)
+        else:
+            self._regex[order] = event
+            self._regex_any = None
+        self._changed(literal)
+
+    def _unregister(self, order: int, event: EventUnit):
+        del self._events[order]
+        self._names[event._event_name].remove(order)
+        literal = event.literal
+        if literal is not None:
+            self._static[literal].remove(order)
+        else:
+            del self._regex[order]
+            self._regex_any = None
+        self._changed(literal)
+
+    def _changed(self, literal):
+        self._resolved.clear()
+        self._generation += 1
+        if literal is not None:
+            self._generations[literal] = self._generation
+        else:
+            self._regex_generation = self._generation
+
+    def _resolve(self, event_name: str, hidden: bool):
+        key = (event_name, hidden)
+        events = self._resolved.get(key)
+        if events is None:
+            orders = list(self._static.get(event_name, ()))
+            if len(self._regex) > 0 and self._match_any(event_name):
+                orders += self._regex.keys()
+            events = tuple((order, self._events[order]) for order in sorted(orders)
+                           if self._events[order].match_name(event_name, hidden))
+            self._resolved.set(key, events)
+        return events
+
+    def _match_any(self, event_name: str):
+        if self._regex_any is None:
+            self._regex_any = self._combine(list(self._regex.values()))
+        combined, others = self._regex_any
+        if combined is not None and combined.search(event_name) is not None:
+            return True
+        return any(event.match_name(event_name, hidden=True) for event in others)
+
+    # one alternation of the patterns without groups (the groups would be renumbered), the others one by one
+    @classmethod
+    def _combine(cls, events):
+        combinable = [event for event in events if _re.compile(event.name).groups == 0]
+        others = [event for event in events if _re.compile(event.name).groups > 0]
+        if len(combinable) == 0:
+            return None, others
+        try:
+            return _re.compile('|'.join('(?:%s)' % event.name for event in combinable)), others
+        # not combinable (inline flags, ...)
+        except _re.error:
+            return None, events
+
     @classmethod
     def delegate(cls, event_name: str, hidden: bool = False):
         return EventDelegate(event_name, hidden)
@@ -70,6 +70,7 @@ class Expression:
     BOOL = 'b'
     INT = 'i'
     FLOAT = 'f'
+    BFLOAT = 'bf'
     INT_DEFAULT = 'i64'
     FLOAT_DEFAULT = 'f32'
 
@@ -87,6 +88,7 @@ class Expression:
     EVENT = None
 
     EXTENSION_SOURCE = 'mp'
+    EXTENSION_COMPILED = 'mpc'
     EXTENSION_BINARY = 'npy'
 
     Signs = RBO + RBC + ABO + ABC + SBO + SBC + ADD + SUB + MAT + MOD + [DOT, COMMA, COMMENT, BACKSLASH]
@@ -1,18 +1,46 @@
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from weakref import ref as _ref
 
 from mp.core.data import *
 from mp.core.error import RequiredError, SyntaxError
 from mp.core.expression import Expression as Exp
 
 
+class Vars(dict):
+    # reports (un)registered variables to the graph
+    def __init__(self, graph):
+        super().__init__()
+        self._graph = graph
+
+    def __setitem__(self, name, var):
+        super().__setitem__(name, var)
+        self._graph.touch(name)
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self._graph.touch(name)
+
+
 class Graph:
 
     def __init__(self):
         super().__init__()
         # count 1 if self.alloc
         self.window = 0
+        # reverse-dependency index (name -> variables linking the name)
+        self._users = defaultdict(set)
+        # node -> variables walking through the node
+        self._containers = defaultdict(set)
+        # variable -> (names, nodes) of the last walk
+        self._walks = dict()
+        # variables to walk again
+        self._dirty = set()
+        # nodes changed since the last walk
+        self._mutated = list()
+        # set to the walked nodes (they report changes to this graph only)
+        self._owner = _ref(self)
         # variables
-        self.vars = dict()
+        self.vars = Vars(self)
         # save/delete files sometime
         self.ios = OrderedDict()
         # print files sometime
@@ -20,6 +48,89 @@ class Graph:
         # point self
         self.var_self = list()
 
+    # walked node changed
+    def notify(self, node):
+        self._mutated.append(node)
+
+    # variable (un)registered
+    def touch(self, name):
+        self._dirty.add(name)
+        # the others stopped walking at the old one
+        self._dirty.update(self._users.get(name, ()))
+
+    # find variables linking the name (a superset of the users)
+    def find_users(self, name):
+        self._update_index()
+        return self._users.get(name, ())
+
+    # whether any other variable uses the name
+    def is_used(self, name):
+        for var_name in self.find_users(name):
+            if var_name == name:
+                continue
+            item = self.vars.get(var_name)
+            if item is not None and item.has_attr(name):
+                return True
+        return False
+
+    # reference (scanning all variables)
+    def _is_used_scan(self, name):
+        for var_name, item in self.vars.items():
+            if var_name == name:
+                continue
+            if item.has_attr(name):
+                return True
+        return False
+
+    def _update_index(self):
+        containers = self._containers
+        for node in self._mutated:
+            self._dirty.update(containers.get(node, ()))
+        self._mutated.clear()
+        dirty, self._dirty = self._dirty, set()
+        for name in dirty:
+            self._unlink(name)
+            if name in self.vars:
+                self._link(name)
+
+    def _unlink(self, name):
+        names, nodes = self._walks.pop(name, ((), ()))
+        for used in names:
+            users = self._users[used]
+            users.discard(name)
+            if len(users) == 0:
+                del self._users[used]
+        for node in nodes:
+            containers = self._containers[node]
+            containers.discard(name)
+            if len(containers) == 0:
+                del self._containers[node]
+
+    # walk until other variables
+    def _link(self, name):
+        root = self.vars[name]
+        names = set()
+        nodes = set()
+        stack = [root]
+        owner = self._owner
+        while len(stack) > 0:
+            node = stack.pop()
+            if node in nodes:
+                continue
+            nodes.add(node)
+            if node._owner is not owner:
+                node._owner = owner
+            if node.name is not None:
+                names.add(node.name)
+            if node is not root and self.vars.get(node.name) is node:
+                continue
+            stack.extend(node.neighbors())
+        for used in names:
+            self._users[used].add(name)
+        for node in nodes:
+            self._containers[node].add(name)
+        self._walks[name] = (names, nodes)
+
     # make new variable name
     def new_name(self):
         name = '%s%s' % (Exp.CODE_CONST, self.window)
@@ -177,16 +288,8 @@ class Graph:
                 return True
             # else
             if var.toward is None:
-                # find using
-                use_item = False
-                for var_name, item in self.vars.items():
-                    if var_name == name:
-                        continue
-                    if item.has_attr(name):
-                        use_item = True
-                        break
                 # useless
-                if not use_item:
+                if not self.is_used(name):
                     # remove delegate
                     old = var.repeat
                     var.repeat = None
@@ -215,15 +318,8 @@ class Graph:
         # else
         # find using
         if name in self.vars.keys():
-            use_item = False
-            for var_name, item in self.vars.items():
-                if var_name == name:
-                    continue
-                if item.has_attr(name):
-                    use_item = True
-                    break
             # useless
-            if not use_item:
+            if not self.is_used(name):
                 # remove args if method
                 for arg in var.args:
                     self.gc(arg)
@@ -1,15 +1,21 @@
 import os
 
 from mp.core import error
+from mp.core.cache import LRUCache
 from mp.core.token import Token
 from mp.core.event import Event
 from mp.core.expression import Expression as Exp
+from mp.core.lexer import Lexer
+from mp.core.literal import Literal
+from mp.core.parser import Parser
 from mp.core.plan import Plan
 
 from mp.monitor import StdMonitor
 
 from mp.utils import interactive as _interactive
 
+_NOT_PARSED = object()
+
 
 class TokenTree(list):
     def __init__(self, parent, head):
@@ -23,47 +29,7 @@ class TokenTree(list):
 
     @classmethod
     def _is_number(cls, token_cat):
-        # test-integer using python trick
-        try:
-            return int(token_cat), Exp.INT_DEFAULT
-        except ValueError:
-            pass
-        # test-real using python trick
-        try:
-            return float(token_cat), Exp.FLOAT_DEFAULT
-        except ValueError:
-            pass
-        # find type
-        try:
-            token_cat = token_cat.lower()
-            for t_name, t_func in zip([Exp.BOOL, Exp.INT, Exp.FLOAT], [bool, int, float]):
-                try:
-                    idx = token_cat.index(t_name)
-                    try:
-                        # is boolean
-                        if t_name == Exp.BOOL:
-                            num = t_func(int(token_cat[:idx]))
-                        # is numeric
-                        else:
-                            num = t_func(token_cat[:idx])
-                    except ValueError:
-                        try:
-                            num = float(token_cat[:idx])
-                            num = t_func(num)
-                        except ValueError:
-                            continue
-                    # is boolean
-                    if t_name == Exp.BOOL:
-                        return num, '%s' % t_name
-                    # is numeric
-                    n_bits = int(token_cat[idx+1:])
-                    if n_bits in [8, 16, 32, 64]:
-                        return num, '%s%d' % (t_name, n_bits)
-                except ValueError:
-                    continue
-        except ValueError:
-            pass
-        return 0, ''
+        return Literal.classify(token_cat)
 
     def tokenize(self):
         if len(self) < self.pointer:
@@ -201,13 +167,20 @@ class TokenTree(list):
 
 
 class Interpreter:
+    # parsed lines kept in memory
+    PARSE_CACHE_SIZE = 65536
 
-    def __init__(self, dir_process: str = './', plan=None, monitor=None, header_file=None, *args, **kwargs):
+    def __init__(self, dir_process: str = './', plan=None, monitor=None, header_file=None, *args,
+                 use_pratt_parser: bool = False, use_mmap=False, **kwargs):
         self.dir_process = os.path.abspath(os.path.join(dir_process))
+        self.use_pratt_parser = use_pratt_parser
+        self.parse_cache = LRUCache(self.PARSE_CACHE_SIZE)
         plan = Plan if plan is None else plan
         monitor = StdMonitor if monitor is None else monitor
         Exp.EVENT = Event()
         self.plan = plan(self.dir_process, self.code_to_data)
+        # binary files : all (True) or the names of the variables
+        self.plan.io.mmap = use_mmap
         self.monitor = monitor()
         self._init_builtin_methods(Plan)
         self._init_builtin_methods(self.plan)
@@ -221,10 +194,21 @@ class Interpreter:
     def code_to_data(self, message: str):
         lines = message.split(Exp.NEXTLINE)
         for line in lines:
-            tokens = self._scanner(line)
+            yield self.line_to_data(line)
+
+    def line_to_data(self, line: str):
+        # parsed ahead
+        data = self.parse_cache.get(line, _NOT_PARSED)
+        if data is not _NOT_PARSED:
+            return data
+        tokens = self._scanner(line)
+        if self.use_pratt_parser:
+            data = Parser.parse(tokens)
+        else:
             prefixes, query = self._parser(tokens)
             data = self._semantic_analysis(prefixes, query)
-            yield data
+        self.parse_cache.set(line, data)
+        return data
 
     def execute_script(self, path: str):
         path = os.path.join(self.dir_process, path)
@@ -236,6 +220,7 @@ class Interpreter:
         _interactive(self, debug=debug)
 
     def __call__(self, message: str, lazy_execute: bool = True):
+        self.plan.stats.clear()
         for data in self.code_to_data(message):
             self.plan.push(data)
             if not lazy_execute:
@@ -251,6 +236,11 @@ class Interpreter:
 
     @classmethod
     def _scanner(cls, line: str):
+        return Lexer.scan(line)
+
+    # reference scanner (character-by-character)
+    @classmethod
+    def _scanner_legacy(cls, line: str):
         result = []
 
         token = ''
@@ -324,7 +314,7 @@ class Interpreter:
 
             # exp
             if w in Exp.ADD + Exp.SUB:
-                if type(object_attr[-1]) is str:
+                if len(object_attr) > 0 and type(object_attr[-1]) is str:
                     if object_attr[-1].endswith('e') and object_attr[-1][0].isdigit():
                         object_attr.append(w)
                         continue
@@ -446,6 +436,7 @@ class Interpreter:
                     if len(object_attr) == 2 and object_attr.head in Exp.Tokens_Operator:
                         object_attr = object_attr.insert_upper(w)
                         object_attr.has_subject = True
+                        object_attr.breakpoint = object_attr.pointer
                         continue
                     # must be tuple
                     if len(object_attr) != 1:
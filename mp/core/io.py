@@ -1,22 +1,34 @@
+import hashlib
+import json
 import os
 
 from mp.core.expression import Expression as Exp
 from mp.core.framework import np
+from mp.core.token import Token
 
 
 class IO:
+    # bump when the layout of parsed tokens changes
+    COMPILED_VERSION = 2
 
-    def __init__(self, dir_main: str, permission: int = 0o775):
+    def __init__(self, dir_main: str, permission: int = 0o775, code_to_data=None, mmap=False):
         if len(dir_main) == 0:
             dir_main = os.path.curdir
         self.dir_main = dir_main
         self.permission = permission
+        # parse scripts into precompiled tokens (.mpc)
+        self.code_to_data = code_to_data
+        # memory-map binary files (.npy) : all (True) or the names (and their children)
+        self.mmap = mmap
 
     def get(self, item: str):
         path = self.get_path(item)
         # is graph file
         path_graph = self._get_graph_path(path)
         if os.path.exists(path_graph):
+            # precompiled tokens
+            if self.code_to_data is not None:
+                return self._load_compiled(path_graph)
             return self._load_graph(path_graph)
         # is binary file
         path_binary = self._get_binary_path(path)
@@ -33,6 +45,9 @@ class IO:
             path_graph = os.path.join(self.dir_main, path_graph)
             if os.path.exists(path_graph):
                 self._remove(path_graph)
+            path_compiled = self._get_compiled_path(path_graph)
+            if os.path.exists(path_compiled):
+                self._remove(path_compiled)
             self._remove_dirs(paths)
             path_binary = '%s.%s' % (self.get_path(item), Exp.EXTENSION_BINARY)
             path_binary = os.path.join(self.dir_main, path_binary)
@@ -51,16 +66,27 @@ class IO:
             path = os.path.join(self.dir_main, path)
             self.make_dir_recursive(paths, self.dir_main, self.permission)
             self._save_graph(path, toward.code)
+            if self.code_to_data is not None:
+                self._save_compiled(path, toward.code)
+
+    def is_mapped(self, name: str):
+        if type(self.mmap) is bool:
+            return self.mmap
+        return any(name == item or name.startswith('%s.' % item) for item in self.mmap)
 
     @classmethod
-    def _load_binary_raw(cls, path):
+    def _load_binary_raw(cls, path, mmap: bool = False):
+        # paged in on demand (copy-on-write : the file is never modified)
+        if mmap:
+            return np.load(path, mmap_mode='c', allow_pickle=False)
         return np.load(path)
 
-    @classmethod
-    def _load_binary(cls, name: str, path: str):
+    def _load_binary(self, name: str, path: str):
         if os.path.exists(path):
+            if self.is_mapped(name):
+                return self._load_binary_raw(path, True)
             with open(path, 'rb') as f:
-                value = cls._load_binary_raw(f)
+                value = self._load_binary_raw(f)
             return value
         return None
 
@@ -72,6 +98,65 @@ class IO:
             return msg
         return None
 
+    def _load_compiled(self, path: str):
+        path_compiled = self._get_compiled_path(path)
+        stat = os.stat(path)
+        header, data = self._read_compiled(path_compiled)
+        # not modified
+        if header is not None and header['mtime'] == stat.st_mtime_ns and header['size'] == stat.st_size:
+            return data
+        msg = self._load_graph(path)
+        digest = self._hash(msg)
+        # touched, but same content
+        if header is not None and header['hash'] == digest:
+            self._write_compiled(path_compiled, stat, digest, data)
+            return data
+        # parse again
+        data = list(self.code_to_data(msg))
+        self._write_compiled(path_compiled, stat, digest, data)
+        return data
+
+    def _save_compiled(self, path: str, code: str):
+        data = list(self.code_to_data(code))
+        self._write_compiled(self._get_compiled_path(path), os.stat(path), self._hash(code), data)
+
+    # data only (JSON) : loading never runs code
+    @classmethod
+    def _read_compiled(cls, path: str):
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with open(path, 'r') as f:
+                raw = json.load(f)
+            header = raw['header']
+            if header.get('version') != cls.COMPILED_VERSION:
+                return None, None
+            data = [Token.from_raw(line) for line in raw['data']]
+        # broken or outdated file
+        except Exception:
+            return None, None
+        return header, data
+
+    @classmethod
+    def _write_compiled(cls, path: str, stat, digest: str, data):
+        header = {
+            'version': cls.COMPILED_VERSION,
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': digest,
+        }
+        try:
+            raw = json.dumps({'header': header, 'data': [Token.to_raw(line) for line in data]})
+            with open(path, 'w') as f:
+                f.write(raw)
+        # read-only library or not plain tokens : parse every time
+        except (OSError, ValueError):
+            pass
+
+    @classmethod
+    def _hash(cls, msg: str):
+        return hashlib.sha1(msg.encode()).hexdigest()
+
     @classmethod
     def _save_binary(cls, path: str, value):
         np.save(path, value, allow_pickle=False)
@@ -108,6 +193,11 @@ class IO:
         path = os.path.join(self.dir_main, path)
         return path
 
+    @classmethod
+    def _get_compiled_path(cls, path_graph: str):
+        path = os.path.splitext(path_graph)[0]
+        return '%s.%s' % (path, Exp.EXTENSION_COMPILED)
+
     @classmethod
     def make_dir_recursive(cls, paths, dir_from=None, permission=0o775):
         path = dir_from if dir_from is not None else ''
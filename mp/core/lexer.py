@@ -0,0 +1,20 @@
+import re as _re
+
+from mp.core.expression import Expression as Exp
+
+
+class Lexer:
+    # multi-character signs, longest first (maximal munch)
+    SIGNS_MULTI = sorted(Exp.Signs_DoubleTriple + Exp.Signs_DoubleDouble, key=len, reverse=True)
+    # single-character signs and indents are emitted one by one
+    SIGNS_SINGLE = frozenset(c for c in Exp.Signs_All + Exp.INDENT if len(c) == 1)
+
+    PATTERN = _re.compile('|'.join(
+        [_re.escape(sign) for sign in SIGNS_MULTI] +
+        ['[%s]' % ''.join(_re.escape(c) for c in sorted(SIGNS_SINGLE)),
+         '[^%s]+' % ''.join(_re.escape(c) for c in sorted(SIGNS_SINGLE))]
+    ))
+
+    @classmethod
+    def scan(cls, line: str):
+        return cls.PATTERN.findall(line)
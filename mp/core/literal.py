@@ -0,0 +1,111 @@
+import re as _re
+
+from mp.core.expression import Expression as Exp
+
+
+class Literal:
+    # type suffixes and their available bits
+    NUM_TYPES = {
+        Exp.BOOL: None,
+        Exp.INT: (8, 16, 32, 64),
+        Exp.FLOAT: (8, 16, 32, 64),
+        Exp.BFLOAT: (16,),
+    }
+    # seen literals (cleared when full)
+    CACHE_SIZE = 65536
+    _cache = {}
+
+    NOT_NUMBER = (0, '')
+
+    # numbers begin with a digit, a dot, 'inf' or 'nan' (after the sign)
+    IDENTIFIER = _re.compile(r'(?!\s*[+-]?(?:[\d.]|inf|nan))', _re.IGNORECASE)
+
+    _NUMBER = r'[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:e[+-]?[0-9]+)?'
+    # (bool is not followed by bfloat's suffix)
+    PATTERN = _re.compile(r'(?:(?P<int>[+-]?[0-9]+)|(?P<float>%s)|(?P<num>%s)(?:(?P<bool>%s)(?!%s).*|(?P<type>%s)(?P<bits>%s)))\Z' % (
+        _NUMBER, _NUMBER,
+        _re.escape(Exp.BOOL), _re.escape(Exp.BFLOAT[len(Exp.BOOL):]),
+        '|'.join(_re.escape(t) for t, bits in NUM_TYPES.items() if bits is not None),
+        '|'.join(sorted({str(b) for bits in NUM_TYPES.values() if bits is not None for b in bits}, key=len, reverse=True)),
+    ), _re.IGNORECASE | _re.DOTALL)
+
+    @classmethod
+    def classify(cls, text: str):
+        num = cls._cache.get(text)
+        if num is not None:
+            return num
+        # identifiers cost one match
+        if cls.IDENTIFIER.match(text) is not None:
+            return cls.NOT_NUMBER
+        num = cls._classify(text)
+        if len(cls._cache) >= cls.CACHE_SIZE:
+            cls._cache.clear()
+        cls._cache[text] = num
+        return num
+
+    @classmethod
+    def _classify(cls, text: str):
+        match = cls.PATTERN.match(text)
+        if match is None:
+            return cls._classify_reference(text)
+        if match.group('int') is not None:
+            return int(text), Exp.INT_DEFAULT
+        if match.group('float') is not None:
+            return float(text), Exp.FLOAT_DEFAULT
+        num = match.group('num')
+        if match.group('bool') is not None:
+            return bool(float(num)), Exp.BOOL
+        t_name = match.group('type').lower()
+        n_bits = int(match.group('bits'))
+        if n_bits not in cls.NUM_TYPES[t_name]:
+            return cls._classify_reference(text)
+        if t_name == Exp.INT:
+            try:
+                return int(num), '%s%d' % (t_name, n_bits)
+            except ValueError:
+                return int(float(num)), '%s%d' % (t_name, n_bits)
+        return float(num), '%s%d' % (t_name, n_bits)
+
+    @classmethod
+    def _classify_reference(cls, token_cat: str):
+        # test-integer using python trick
+        try:
+            return int(token_cat), Exp.INT_DEFAULT
+        except ValueError:
+            pass
+        # test-real using python trick
+        try:
+            return float(token_cat), Exp.FLOAT_DEFAULT
+        except ValueError:
+            pass
+        # find type
+        try:
+            token_cat = token_cat.lower()
+            for t_name, t_func in zip([Exp.BFLOAT, Exp.BOOL, Exp.INT, Exp.FLOAT], [float, bool, int, float]):
+                try:
+                    idx = token_cat.index(t_name)
+                    try:
+                        # is boolean
+                        if t_name == Exp.BOOL:
+                            num = t_func(int(token_cat[:idx]))
+                        # is numeric
+                        else:
+                            num = t_func(token_cat[:idx])
+                    except ValueError:
+                        try:
+                            num = float(token_cat[:idx])
+                            num = t_func(num)
+                        except ValueError:
+                            continue
+                    # is boolean
+                    if t_name == Exp.BOOL:
+                        return num, '%s' % t_name
+                    # is numeric
+                    n_bits = int(token_cat[idx+len(t_name):])
+                    if n_bits in cls.NUM_TYPES[t_name]:
+                        return num, '%s%d' % (t_name, n_bits)
+                except ValueError:
+                    continue
+        except ValueError:
+            pass
+        return cls.NOT_NUMBER
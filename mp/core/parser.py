@@ -0,0 +1,285 @@
+from mp.core import error
+from mp.core.expression import Expression as Exp
+from mp.core.literal import Literal
+from mp.core.token import Token
+
+
+class Parser:
+    # binary operators climbed by binding power (assignments are handled per statement)
+    BINARY = {op: order for op, order in Exp.Tokens_Order.items()
+              if op in Exp.Tokens_Operator and order > 0}
+    ASSIGN = frozenset(Exp.Tokens_Inplace)
+    SIGNS = frozenset(Exp.Signs_All)
+    INDENT = frozenset(Exp.INDENT)
+    EXPONENT = frozenset(Exp.ADD + Exp.SUB)
+    # tokens glued into a single atom
+    ATOM = frozenset([Exp.DOT, Exp.BACKSLASH])
+    PREFIX = frozenset(Exp.Tokens_Prefix)
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    @classmethod
+    def parse(cls, tokens):
+        # cut comments
+        if Exp.COMMENT in tokens:
+            tokens = tokens[:tokens.index(Exp.COMMENT)]
+        if Exp.EM[0] in tokens:
+            raise error.SyntaxError(Exp.EM[0])
+        return cls(tokens)._line()
+
+    # ---------------------------------------------------------------
+    # cursor
+    # ---------------------------------------------------------------
+
+    def _peek(self):
+        tokens = self.tokens
+        while self.pos < len(tokens) and tokens[self.pos] in self.INDENT:
+            self.pos += 1
+        if self.pos < len(tokens):
+            return tokens[self.pos]
+        return None
+
+    def _next(self):
+        w = self._peek()
+        self.pos += 1
+        return w
+
+    def _is_text(self, w):
+        return w is not None and w not in self.SIGNS and w not in self.INDENT
+
+    def _is_atom(self, w):
+        return self._is_text(w) or w in self.ATOM
+
+    # ---------------------------------------------------------------
+    # line
+    # ---------------------------------------------------------------
+
+    def _line(self):
+        tokens = self.tokens
+        # find prefixes: [from X] (save|del|print) query
+        dir_from = None
+        keyword = None
+        raw = []
+        has_from = False
+        i = 0
+        while i < len(tokens):
+            w = tokens[i]
+            if w in Exp.FROM:
+                if has_from or len(raw) > 0:
+                    raise error.SyntaxError(w)
+                has_from = True
+            elif w in Exp.Tokens_Prefix:
+                if has_from:
+                    if len(raw) == 0:
+                        raise error.SyntaxError(w)
+                    dir_from = Token.from_var(''.join(raw))
+                keyword = w
+                i += 1
+                break
+            elif w in self.INDENT:
+                if len(raw) > 0:
+                    raw.append(w)
+            elif self._is_atom(w):
+                # subject cannot be numeric or start with a sign
+                if len(raw) == 0 and (w in self.ATOM or len(Literal.classify(w)[1]) > 0):
+                    raise error.SyntaxError(w)
+                raw.append(w)
+            else:
+                break
+            i += 1
+        if has_from and keyword is None:
+            raise error.SyntaxError(Exp.FROM[0])
+
+        # just data
+        if keyword is None:
+            if self._peek() is None:
+                return None
+            query = self._statement()
+            self._end()
+            return query
+
+        # (save, delete, print) files
+        self.pos = i
+        if self._peek() is None:
+            return None
+        query = self._expr_list(0)
+        self._end()
+        files = list(query.args) if query.data_type == Token.TYPE_TUPLE else [query]
+        for file in files:
+            if file.data_type not in (Token.TYPE_VARIABLE, Token.TYPE_NUMBER):
+                raise error.SyntaxError(keyword)
+        if keyword in Exp.SAVE:
+            return Token.from_save(dir_from, *files)
+        if keyword in Exp.DELETE:
+            return Token.from_delete(dir_from, *files)
+        return Token.from_print(dir_from, *files)
+
+    def _end(self):
+        w = self._peek()
+        if w is not None:
+            raise error.SyntaxError(w)
+
+    def _statement(self):
+        lhs = self._expr_list(0)
+        while self._peek() in self.ASSIGN:
+            op = self._next()
+            # only = takes a tuple without shell ()
+            if op in Exp.IS:
+                rhs = self._expr_list(0, signed=True)
+            else:
+                rhs = self._expr(0)
+            lhs = Token.from_operator(op, lhs, rhs)
+        return lhs
+
+    # ---------------------------------------------------------------
+    # expressions
+    # ---------------------------------------------------------------
+
+    def _expr_list(self, min_order, signed=False):
+        item = self._expr(min_order, signed)
+        if self._peek() != Exp.COMMA:
+            return item
+        items = [item]
+        while self._peek() == Exp.COMMA:
+            self.pos += 1
+            w = self._peek()
+            if w is None or w in self.ASSIGN or w in Exp.Tokens_Close:
+                break
+            items.append(self._expr(min_order))
+        return Token.from_tuple(*items)
+
+    def _expr(self, min_order, signed=False):
+        lhs = self._unary(signed)
+        while True:
+            op = self._peek()
+            order = self.BINARY.get(op)
+            if order is None or order < min_order:
+                return lhs
+            self.pos += 1
+            # left-associative
+            rhs = self._expr(order + 1)
+            lhs = Token.from_operator(op, lhs, rhs)
+
+    def _unary(self, signed):
+        w = self._peek()
+        # the sign is glued to the operand right after '=', elsewhere only to numbers
+        if w in Exp.SUB:
+            self.pos += 1
+            item = self._atom(prefix=w)
+            if not signed and item.data_type != Token.TYPE_NUMBER:
+                raise error.SyntaxError(w)
+            return self._postfix(item)
+        if w in Exp.RBO:
+            self.pos += 1
+            return self._postfix(self._group())
+        if self._is_atom(w):
+            return self._postfix(self._atom())
+        raise error.SyntaxError(w if w is not None else Exp.NEXTLINE)
+
+    def _atom(self, prefix=''):
+        tokens = self.tokens
+        texts = [prefix] if prefix else []
+        while self.pos < len(tokens):
+            w = tokens[self.pos]
+            if w in self.PREFIX:
+                raise error.SyntaxError(w)
+            if self._is_atom(w):
+                texts.append(w)
+            elif w in self.INDENT:
+                if len(texts) > 0:
+                    texts.append(w)
+            # exponent of real numbers (1e-3)
+            elif w in self.EXPONENT and len(texts) > 0 and texts[-1][-1:] == 'e' and texts[-1][:1].isdigit():
+                texts.append(w)
+            else:
+                break
+            self.pos += 1
+        if len(texts) == 0:
+            raise error.SyntaxError(self._peek())
+        text = ''.join(texts)
+        # is numeric
+        num, type_num = Literal.classify(text)
+        if len(type_num) > 0:
+            return Token.from_number(type_num, num)
+        # is variable
+        return Token.from_var(Exp.DOT.join(name.strip() for name in text.split(Exp.DOT)))
+
+    def _postfix(self, subject):
+        while True:
+            w = self._peek()
+            if w in Exp.RBO:
+                self.pos += 1
+                subject = Token.from_range(Exp.SHELL_RR[0], subject, *self._args(Exp.RBC[0]))
+            elif w in Exp.SBO:
+                self.pos += 1
+                subject = Token.from_range(Exp.SHELL_SS[0], subject, *self._args(Exp.SBC[0], slices=False))
+            elif w in Exp.ABO:
+                self.pos += 1
+                subject = Token.from_range(Exp.SHELL_AA[0], subject, *self._args(Exp.ABC[0], slices=False))
+            else:
+                return subject
+
+    def _group(self):
+        # starts with an item
+        w = self._peek()
+        if w == Exp.COMMA or w in self.ATOM:
+            raise error.SyntaxError(w)
+        items = self._args(Exp.RBC[0])
+        # remove shell () if the only item is a variable, an operator or a shell ()
+        if len(items) == 1:
+            item = items[0]
+            if item.data_type in (Token.TYPE_VARIABLE, Token.TYPE_TUPLE) or \
+                    item.data_type == Token.TYPE_OPERATOR and item.name not in Exp.SHELL_SS + Exp.SHELL_AA:
+                return item
+        return Token.from_tuple(*items)
+
+    def _args(self, close, slices=True):
+        args = []
+        while True:
+            w = self._peek()
+            if w == close:
+                self.pos += 1
+                return args
+            if w is None:
+                raise error.SyntaxError(close)
+            # skip empty arguments
+            if w == Exp.COMMA:
+                self.pos += 1
+                continue
+            args.append(self._arg(close, slices))
+
+    def _arg(self, close, slices):
+        # slices (a:b:c)
+        if self._peek() in Exp.IDX:
+            item = None
+        else:
+            item = self._expr(1)
+        w = self._peek()
+        # keywords (a=b)
+        if w in self.ASSIGN and item is not None:
+            self.pos += 1
+            return Token.from_operator(w, item, self._expr(1, signed=w in Exp.IS))
+        if w not in Exp.IDX:
+            return item
+        if not slices:
+            raise error.SyntaxError(w)
+        false = Token.from_number(Exp.BOOL, False)
+        indices = [item if item is not None else false]
+        n_colons = 0
+        while self._peek() in Exp.IDX and n_colons < 2:
+            self.pos += 1
+            n_colons += 1
+            w = self._peek()
+            if w in Exp.IDX or w == Exp.COMMA or w == close:
+                index = None
+            else:
+                index = self._expr(1)
+            if index is not None:
+                while len(indices) < n_colons:
+                    indices.append(false)
+                indices.append(index)
+            elif n_colons == 2 and len(indices) == 1:
+                indices.append(false)
+        return Token.from_operator(Exp.IDX[0], *indices)
@@ -1,3 +1,5 @@
+from collections import Counter
+
 from mp.core import attribute as attr
 from mp.core import builtins as _builtins
 from mp.core import data
@@ -7,6 +9,9 @@ from mp.core.expression import Expression as Exp
 from mp.core.graph import Graph
 from mp.core.io import IO
 
+# the key of an empty argument (slices)
+_EMPTY = ('empty',)
+
 
 class Plan:
     BUILTINS = _builtins
@@ -14,13 +19,26 @@ class Plan:
 
     MAP_NUM_TYPE = framework.MAP_NUM_TYPE
 
+    # evaluate pure operations on constants once
+    FOLD_CONSTANTS = True
+    # share equal pure subtrees
+    SHARE_SUBTREES = True
+    # fuse chains of builtins: (outer, inner) -> fused builtin
+    FUSE_OPERATORS = True
+    FUSIONS = dict()
+
     def __init__(self, dir_process: str, message_to_data):
         self.code_to_data = message_to_data
         self.attr = attr.AttrDict()
-        self.io = self.CLASS_IO(dir_process)
+        self.io = self.CLASS_IO(dir_process, code_to_data=message_to_data)
         self.graph = Graph()
         # Manages events for built-in methods.
         self.event = Exp.EVENT
+        # optimization reports
+        self.stats = Counter()
+        # structural key -> shared attribute (cleared each execute)
+        self._shared = dict()
+        self._shared_ids = set()
 
     # execute along IO
     def execute(self):
@@ -34,8 +52,10 @@ class Plan:
         # if error : finish
         except BaseError as e:
             self.graph.clear()
+            self._clear_shared()
             raise e
         self.graph.clear()
+        self._clear_shared()
 
     # find method in builtins
     @classmethod
@@ -43,10 +63,162 @@ class Plan:
         method = Exp.EVENT.find_unique(name, find_hidden)
         if method is not None:
             fixed = method.fixed
-            method = Exp.EVENT.delegate(name, find_hidden)
+            method = Exp.EVENT.bind(name, find_hidden)
             return method, fixed
         return None, None
 
+    @classmethod
+    def is_pure(cls, name: str, find_hidden: bool = True):
+        method = Exp.EVENT.find_unique(name, find_hidden)
+        return method is not None and method.pure
+
+    # replace pure operations on constants with their results
+    def _fold_constants(self, attribute):
+        if not self.FOLD_CONSTANTS:
+            return attribute
+        names = attribute.event_names
+        if names is None:
+            return attribute
+        for child in attribute.children:
+            if not child.is_constant:
+                return attribute
+        for name in names:
+            if not self.is_pure(name):
+                return attribute
+        # leave errors to be raised on use
+        try:
+            value = attribute.get_value()
+        except Exception:
+            return attribute
+        self.stats['folded constants'] += 1
+        return attr.AttrConst(value)
+
+    # replace a user-defined method called on another (relu(dense(...))) with the fused builtin
+    def _fuse(self, attribute):
+        if not self.FUSE_OPERATORS or attribute.repeat is not None or len(attribute.args) != 1:
+            return attribute
+        inner = attribute.args.list[0]
+        if type(inner) is not attr.AttrIteration or inner.repeat is not None:
+            return attribute
+        outer_body, inner_body = attribute.method, inner.method
+        for body in (outer_body, inner_body):
+            if type(body) is not attr.AttrMethod or body.is_pointer or body.repeat is not None:
+                return attribute
+        # the outer method is applied to its only argument
+        if outer_body.args.list != attribute.placeholders.list[:1]:
+            return attribute
+        key = outer_body.event_names[0], inner_body.event_names[0]
+        name = self.FUSIONS.get(key)
+        if name is None:
+            return attribute
+        method, fixed = self.find_method(name)
+        if method is None:
+            return attribute
+        body = attr.AttrMethod(self, name, method, inner_body.toward, inner_body.args, inner_body.kwargs, fixed)
+        body.digest = name, inner_body.digest
+        self.stats['fused %s(%s)' % key] += 1
+        return attr.AttrIteration(inner.name, body, inner.toward, inner.placeholders, inner.args)
+
+    # share equal pure subtrees (common subexpression elimination)
+    def _share_subtree(self, attribute):
+        if not self.SHARE_SUBTREES:
+            return attribute
+        key = self._structural_key(attribute)
+        if key is None:
+            return attribute
+        shared = self._shared.get(key)
+        if shared is None:
+            self._shared[key] = attribute
+            self._shared_ids.add(id(attribute))
+            return attribute
+        # keep the value for the other parents
+        shared.shared = True
+        self.stats['shared subtrees'] += 1
+        return shared
+
+    def _clear_shared(self):
+        self._shared.clear()
+        self._shared_ids.clear()
+
+    def _structural_key(self, attribute):
+        if type(attribute) is attr.AttrIteration:
+            if attribute.repeat is not None or not self._is_pure_tree(attribute.method):
+                return None
+            placeholders = tuple(id(arg) for arg in attribute.placeholders.list)
+            head = (Exp.METHOD[0], attribute.method.digest, placeholders)
+        else:
+            names = attribute.event_names
+            if names is None:
+                return None
+            for name in names:
+                if not self.is_pure(name):
+                    return None
+            head = (type(attribute).__name__, names)
+            # methods may be called by aliases
+            if type(attribute) is not attr.AttrMethod:
+                head += (attribute.name,)
+        keys = [self._child_key(child) for child in self._slots(attribute)]
+        if None in keys:
+            return None
+        return head + tuple(keys)
+
+    # arguments in place (x(n:) and x(:n) differ by the empty bounds)
+    @classmethod
+    def _slots(cls, attribute):
+        if type(attribute) is attr.AttrIteration:
+            return attribute.args.list
+        if isinstance(attribute, attr.AttrShell):
+            return [attribute.sub] + attribute.args.list
+        if isinstance(attribute, attr.AttrOP):
+            return attribute.args.list
+        if type(attribute) is attr.AttrMethod:
+            slots = list(attribute.args.list)
+            for name, arg in attribute.kwargs.dict.items():
+                slots += [name, arg]
+            return slots
+        return attribute.children
+
+    def _child_key(self, child):
+        # empty arguments
+        if child is None:
+            return _EMPTY
+        # keyword names
+        if type(child) is str:
+            return child
+        # literals
+        if child.is_constant:
+            return child.digest if child.digest is not None else id(child)
+        # variables
+        if type(child) is attr.Attr:
+            if child.name.startswith(Exp.CODE_PARAM) or child.name == Exp.CODE_PLACEHOLDER:
+                return None
+            return id(child)
+        # shared subtrees
+        if id(child) in self._shared_ids:
+            return id(child)
+        return None
+
+    # whether a method body has no side effects
+    def _is_pure_tree(self, attribute):
+        if attribute.is_constant or type(attribute) is attr.Attr:
+            return True
+        if type(attribute) is attr.AttrIteration:
+            if attribute.repeat is not None:
+                return False
+            children = [attribute.method] + attribute.args.children
+        else:
+            names = attribute.event_names
+            if names is None:
+                return False
+            for name in names:
+                if not self.is_pure(name):
+                    return False
+            children = attribute.children
+        for child in children:
+            if not self._is_pure_tree(child):
+                return False
+        return True
+
     def _get_wait_list(self, wait_list):
         while len(wait_list) > 0:
             var_name, append = wait_list.popitem(last=False)
@@ -102,7 +274,8 @@ class Plan:
 
     def _execute_variable_modify(self, var, toward):
         var.toward = self._execute_recursive(toward.toward)
-        var.code = toward.encode()
+        var.source = toward
+        var.digest = toward.digest
         var.is_data = toward.is_data
         return var
 
@@ -122,7 +295,7 @@ class Plan:
             self._execute_variable_point(var, toward)
         # if changed or not data
         if toward.toward is not None:
-            if toward.encode() != var.code or not var.is_data:
+            if toward.digest != var.digest or not var.is_data:
                 self._execute_variable_modify(var, toward)
         return var
 
@@ -133,6 +306,7 @@ class Plan:
         # create new tensor object
         value = self._new_const(toward)
         const = attr.AttrConst(value)
+        const.digest = toward.digest
         return const
 
     def _execute_operator_modify(self, toward):
@@ -150,7 +324,7 @@ class Plan:
         # the others
         args = attr.AttrTuple([toward.sub, toward.obj, toward.step, *toward.args], self._execute_recursive)
         op = attr.AttrOP(toward.op, args)
-        return op
+        return self._share_subtree(self._fold_constants(op))
 
     def _execute_indexed(self, toward: data.Indexed):
         return self._execute_shell(toward, attr.AttrIndexed)
@@ -165,7 +339,7 @@ class Plan:
         sub = self._execute_recursive(toward.sub)
         args = attr.AttrTuple(toward.args, self._execute_recursive)
         op = attribute_type(sub, args)
-        return op
+        return self._share_subtree(self._fold_constants(op))
 
     def _execute_tuple(self, toward: data.Tuple):
         return attr.AttrTuple(toward.args, self._execute_recursive)
@@ -194,7 +368,8 @@ class Plan:
             args = attr.AttrTuple(toward_origin.args, self._execute_recursive)
             kwargs = attr.AttrDict(toward_origin.kwargs, self._execute_recursive)
             repeat = self._execute_recursive(repeat)
-            return attr.AttrMethod(self, name, method, toward_origin, args, kwargs, fixed, repeat)
+            method = attr.AttrMethod(self, name, method, toward_origin, args, kwargs, fixed, repeat)
+            return self._share_subtree(self._fold_constants(method))
         # if user-defined methods
         if toward.is_method_defined:
             return self._execute_method_defined(toward, name, toward_origin.args, repeat)
@@ -218,12 +393,12 @@ class Plan:
         placeholders = attr.AttrTuple(toward.args, self._execute_recursive)
         # call method
         method = self._execute_recursive(toward.toward)
-        method.code = toward.toward.encode()
+        method.digest = toward.toward.digest
         # add repeat
         repeat = self._execute_recursive(repeat)
         # create iteration
         method = attr.AttrIteration(toward.name, method, toward, placeholders, args, repeat)
-        return method
+        return self._share_subtree(self._fuse(method))
 
     # find variable from file-system
     def _find_variable(self, toward):
@@ -235,14 +410,16 @@ class Plan:
         # not found
         if value is None:
             raise RequiredError(name)
-        # if graph
+        # if script
         if type(value) is str:
+            value = list(self.code_to_data(value))
+        # if graph (precompiled)
+        if type(value) is list:
             # set 'self'
             self.graph.push_self(name)
             # load script
-            values = list(self.code_to_data(value))
-            for value in values:
-                self.push(value)
+            for line in value:
+                self.push(line)
             # remove 'self'
             self.graph.pop_self()
             # just script
@@ -255,7 +432,8 @@ class Plan:
             toward.toward = value
             var = self._execute_recursive(toward)
             return var
-        raise NotImplementedError
+        # if binary (loaded or mapped)
+        return attr.AttrConst(value)
 
     # return new constant
     def _new_const(self, toward):
@@ -20,6 +20,25 @@ class Token:
     def from_binary(cls, raw):
         pass
 
+    # plain values (precompiled scripts)
+    @classmethod
+    def to_raw(cls, value):
+        if isinstance(value, Token):
+            return [value.name, value.data_type] + [cls.to_raw(arg) for arg in value.args]
+        if value is None or type(value) in (bool, int, float, str):
+            return value
+        raise ValueError(value)
+
+    @classmethod
+    def from_raw(cls, raw):
+        if type(raw) is list:
+            if len(raw) < 2 or type(raw[0]) is not str or type(raw[1]) is not int:
+                raise ValueError(raw)
+            return Token(raw[0], raw[1], *[cls.from_raw(arg) for arg in raw[2:]])
+        if raw is None or type(raw) in (bool, int, float, str):
+            return raw
+        raise ValueError(raw)
+
     @classmethod
     def from_operator(cls, operator, *args):
         operator = str(operator)
@@ -3,16 +3,23 @@ from tqdm import tqdm
 from mp.core import extension as _ext
 from mp.core import framework
 from mp.core.expression import Expression as Exp
+from mp.core.error import IOError as _IOError
 from mp.core.error import WWWNotFound, WWWNotInCandidate
 from mp.core.io import IO
 
 from mp.core.framework import np as _np
 
+from concurrent.futures import ThreadPoolExecutor
+
 import gzip
 import os
 import requests
 
 CHUNK_SIZE = 4096
+# decompressed bytes per read
+CHUNK_SIZE_DECOMPRESS = 1 << 20
+# files decompressed in parallel (zlib releases the GIL)
+NUM_WORKERS = 4
 
 
 class ContentLoader:
@@ -70,12 +77,83 @@ def decompress(plan, name: str, path: str, filetype: str, num_type: str, shape=N
 
     print('[www] Decompressing %s' % name)
     if filetype in ['gz']:
+        dtype = _np.dtype(framework.MAP_NUM_TYPE[num_type])
+        # renamed when completed
+        file_tmp = '%s.tmp' % file_out
         with gzip.open(file_in, 'rb') as f_in:
-            dtype = framework.MAP_NUM_TYPE[num_type]
-            raw = _np.frombuffer(f_in.read(), dtype, offset=offset)
-            if shape is not None:
-                raw = raw.reshape(*shape)
-            _np.save(file_out, raw, allow_pickle=False)
+            header = _read_exactly(f_in, offset)
+            size = _idx_size(header)
+            if size is None:
+                size = (_gzip_size(file_in) - offset) // dtype.itemsize
+            # preallocated (the header of .npy), then filled by chunks
+            raw = _np.lib.format.open_memmap(file_tmp, 'w+', dtype, _resolve_shape(shape, size))
+            begin, nbytes = raw.offset, raw.nbytes
+            del raw
+            chunk = bytearray(CHUNK_SIZE_DECOMPRESS)
+            total = 0
+            with open(file_tmp, 'r+b') as f_out:
+                f_out.seek(begin)
+                while total < nbytes:
+                    read = f_in.readinto(memoryview(chunk)[:min(len(chunk), nbytes - total)])
+                    if read == 0:
+                        break
+                    f_out.write(memoryview(chunk)[:read])
+                    total += read
+            broken = total != nbytes or len(f_in.read(dtype.itemsize)) != 0
+        if broken:
+            os.remove(file_tmp)
+            raise _IOError(file_in)
+        os.replace(file_tmp, file_out)
+
+
+def decompress_all(plan, jobs, num_workers: int = None):
+    # jobs : the arguments of decompress (without plan)
+    num_workers = NUM_WORKERS if num_workers is None else num_workers
+    if num_workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            decompress(plan, *job)
+        return
+    with ThreadPoolExecutor(min(num_workers, len(jobs))) as executor:
+        futures = [executor.submit(decompress, plan, *job) for job in jobs]
+        for future in futures:
+            future.result()
+
+
+def _read_exactly(f, size: int):
+    data = b''
+    while len(data) < size:
+        chunk = f.read(size - len(data))
+        if len(chunk) == 0:
+            break
+        data += chunk
+    return data
+
+
+# IDX : magic (0, 0, type, dims) and the sizes (big-endian)
+def _idx_size(header: bytes):
+    if len(header) < 4 or header[:2] != b'\0\0' or len(header) != 4 + 4 * header[3]:
+        return None
+    size = 1
+    for i in range(header[3]):
+        size *= int.from_bytes(header[4 + 4 * i:8 + 4 * i], 'big')
+    return size
+
+
+# uncompressed size of the last member (modulo 2^32)
+def _gzip_size(path: str):
+    with open(path, 'rb') as f:
+        f.seek(-4, os.SEEK_END)
+        return int.from_bytes(f.read(4), 'little')
+
+
+def _resolve_shape(shape, size: int):
+    if shape is None:
+        return size,
+    known = 1
+    for dim in shape:
+        if dim != -1:
+            known *= dim
+    return tuple(size // known if dim == -1 else dim for dim in shape)
 
 
 @_ext.header('www', fixed=True)
@@ -4,7 +4,7 @@
 from mp.core import extension as _ext
 from mp.core.error import WWWNotInCandidate
 
-from mp.dataset.core import decompress as _decompress
+from mp.dataset.core import decompress_all as _decompress_all
 from mp.dataset.core import www as _www
 
 FILE_TYPE = 'gz'
@@ -34,9 +34,12 @@ OFFSET_MNIST = {
 
 @_ext.dataset(BASE_DIR, MAP_MNIST.keys())
 def method_dataset_mnist(plan, name, filename, args):
-    url = MAP_MNIST[filename]
-    path = _www(url, BASE_DIR, filename, FILE_TYPE, plan)
-    shape = SHAPE_MNIST[filename]
-    offset = OFFSET_MNIST[filename]
-    _decompress(plan, name, path, FILE_TYPE, DATA_TYPE, shape, offset=offset)
+    # the files of the split (images and labels) are prepared together
+    split = filename.split('.')[0]
+    jobs = []
+    for key, url in MAP_MNIST.items():
+        if key.split('.')[0] == split:
+            path = _www(url, BASE_DIR, key, FILE_TYPE, plan)
+            jobs.append(('%s.%s' % (BASE_DIR, key), path, FILE_TYPE, DATA_TYPE, SHAPE_MNIST[key], OFFSET_MNIST[key]))
+    _decompress_all(plan, jobs)
     return plan.io.get(name)
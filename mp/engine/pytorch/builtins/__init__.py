@@ -1,5 +1,7 @@
 from mp.engine.pytorch.builtins.core import *
+from mp.engine.pytorch.builtins.checkpoint import *
 from mp.engine.pytorch.builtins.dataset import *
+from mp.engine.pytorch.builtins.export import *
 from mp.engine.pytorch.builtins.math import *
 from mp.engine.pytorch.builtins.nn import *
 from mp.engine.pytorch.builtins.optim import *
@@ -0,0 +1,60 @@
+from mp.core import extension as _ext
+from mp.core.attribute import Attr, AttrIteration, CacheIndex
+from mp.engine.pytorch.framework import torch as _torch
+
+
+# the attributes calculated again during backward (and the others given)
+def _find_segment(root):
+    inner, inputs = [], []
+    placeholders = set()
+    visited = set()
+    stack = [(root, False)]
+    while len(stack) > 0:
+        node, in_body = stack.pop()
+        if id(node) in visited or node.is_constant:
+            continue
+        visited.add(id(node))
+        if type(node) is Attr:
+            if id(node) not in placeholders:
+                inputs.append(node)
+            continue
+        # changed between the calculations (e.g. batch) or kept
+        if not in_body and (node.fixed or node.shared or
+                            type(node) is not AttrIteration and CacheIndex._is_volatile(node)):
+            inputs.append(node)
+            continue
+        inner.append(node)
+        if type(node) is AttrIteration:
+            placeholders.update(id(arg) for arg in node.placeholders.list if arg is not None)
+            stack.append((node.method, True))
+            stack.extend((arg, in_body) for arg in node.args.children)
+            continue
+        stack.extend((child, in_body) for child in node.children)
+    return inner, inputs
+
+
+@_ext.static('checkpoint')
+def method_checkpoint(plan, toward, args, kwargs):
+    symbol = '[checkpoint]' if toward is None else toward.symbol
+    args.assert_sizeof(symbol, 1)
+    sub, = args.list
+    # the variable itself is calculated again
+    while type(sub) is Attr and sub.toward is not None:
+        sub = sub.toward
+    if sub.is_constant or not _torch.is_grad_enabled():
+        return Attr.to_value(sub)
+
+    inner, inputs = _find_segment(sub)
+    for node in inputs:
+        # kept for the recalculation (until remove_cache)
+        if type(node) is not Attr:
+            node.shared = True
+        node.get_value()
+
+    def forward():
+        value = sub._calculate()
+        # the intermediates are not kept
+        for node in inner:
+            node.value = None
+        return value
+    return _torch.utils.checkpoint.checkpoint(forward, use_reentrant=False)
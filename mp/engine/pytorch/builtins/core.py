@@ -28,7 +28,7 @@ def method_randn(plan, toward, args, kwargs):
     return value
 
 
-@_ext.static('var', fixed=True)
+@_ext.static('var', fixed=True, volatile=True)
 def method_var(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 2)
     weight, optim = args.get_value()
@@ -45,7 +45,7 @@ def method_copy(plan, toward, args, kwargs):
     return sub.clone()
 
 
-@_ext.static('float')
+@_ext.static('float', pure=True)
 def method_float(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1)
     x, = args.get_value()
@@ -53,7 +53,7 @@ def method_float(plan, toward, args, kwargs):
     return x
 
 
-@_ext.static('long')
+@_ext.static('long', pure=True)
 def method_long(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1)
     x, = args.get_value()
@@ -1,13 +1,77 @@
 from math import ceil
+from queue import Full, Queue
+from threading import Event as _ThreadEvent, Thread
 
 from mp.core import extension as _ext
+from mp.engine.pytorch.device import Device
 from mp.engine.pytorch.framework import torch as _torch
 
 
+class _Prefetcher(Thread):
+    def __init__(self, batches, size: int):
+        super().__init__(daemon=True)
+        self._batches = batches
+        self._queue = Queue(size)
+        self._stopped = _ThreadEvent()
+        self.start()
+
+    def run(self):
+        try:
+            for batch in self._batches:
+                if not self._put(batch):
+                    return
+        # raised by the next get()
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def get(self):
+        item = self._queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class _Permutation:
+    # drawn once for each epoch (shared by the paired batches)
+    def __init__(self):
+        self.epoch = 0
+        self._drawn = dict()
+
+    # by 'reset batch' (registered before the batches)
+    def next_epoch(self):
+        self.epoch += 1
+
+    def get(self, length: int, device):
+        drawn_epoch, indices = self._drawn.get(length, (None, None))
+        if drawn_epoch != self.epoch:
+            indices = _torch.randperm(length, device=device)
+            self._drawn[length] = self.epoch, indices
+        return indices
+
+
 class DatasetBatch:
-    def __init__(self, code, args):
+    def __init__(self, code, args, prefetch: int = 0, permutation=None):
         self.code = code
         self.args = args
+        # batches prepared ahead (on a thread)
+        self.prefetch = prefetch
+        self._prefetcher = None
+        # (length, device) -> indices of the current epoch
+        self._permutation = permutation
+        self.indices = None
 
         self.iter = 0
         self.origin = None
@@ -24,9 +88,36 @@ class DatasetBatch:
         self.iter += self.batch_size
 
     def next(self):
-        indices = self._get_indices()
+        if self._prefetcher is not None:
+            self._update_iter()
+            return self._to_device(self._prefetcher.get())
+        batch = self._gather(self.origin, self.indices, self._get_indices())
         self._update_iter()
-        return self.origin[indices]
+        return batch
+
+    # gathered from the origin (without copying the dataset)
+    @classmethod
+    def _gather(cls, origin, indices, window: slice):
+        if indices is None:
+            return origin[window]
+        return origin.index_select(0, indices[window])
+
+    # in the same order as next() (the other batches are paired)
+    def _prepare_all(self, origin, indices):
+        pin = origin.device.type == 'cpu' and Device.get().type == 'cuda'
+        for begin in range(0, self.length, self.batch_size):
+            batch = self._gather(origin, indices, slice(begin, begin + self.batch_size))
+            # copied (read here, even from the memory maps)
+            if indices is None:
+                batch = batch.clone(memory_format=_torch.contiguous_format)
+            yield batch.pin_memory() if pin else batch
+
+    @classmethod
+    def _to_device(cls, batch):
+        device = Device.get()
+        if batch.device != device:
+            return batch.to(device, non_blocking=True)
+        return batch
 
     # ------------ For Events -------------------------------
 
@@ -34,11 +125,18 @@ class DatasetBatch:
         return self.iter < self.length
 
     def reset(self):
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
         self.iter = 0
         self.args.remove_cache()
         self.origin, batch_size = self.args.get_value()
         self.batch_size = int(batch_size)
         self.length = self.origin.shape[0]
+        if self._permutation is not None:
+            self.indices = self._permutation(self.length, self.origin.device)
+        if self.prefetch > 0:
+            self._prefetcher = _Prefetcher(self._prepare_all(self.origin, self.indices), self.prefetch)
         return self.code
 
     def __len__(self):
@@ -54,7 +152,19 @@ def method_dataset_batch(plan, toward, args, kwargs):
         return method[0]
     # Prepare a new method.
     args.assert_sizeof(toward.symbol, 2)
-    method = DatasetBatch(code, args)
+    # batch(x, 50, _prefetch=4)
+    prefetch = kwargs.dict.get('_prefetch')
+    prefetch = int(prefetch.get_value()) if prefetch is not None else 0
+    # batch(x, 50, _shuffle=true) : the same order for x and y
+    shuffle = kwargs.dict.get('_shuffle')
+    permutation = None
+    if shuffle is not None and bool(shuffle.get_value()):
+        if plan.event.find_unique('get batch permutation', True) is None:
+            shared = _Permutation()
+            plan.event.add('reset batch', shared.next_epoch)
+            plan.event.add('get batch permutation', shared.get, unique=True)
+        permutation = plan.event.bind('get batch permutation')
+    method = DatasetBatch(code, args, prefetch, permutation)
     # Register the method in the event management class.
     plan.event.add(code, method.next)
     plan.event.add('has next batch', method.has_next)
@@ -0,0 +1,13 @@
+import os
+
+from mp.core import extension as _ext
+from mp.engine.pytorch.export import Exporter
+
+
+@_ext.static('export', fixed=True)
+def method_export(plan, toward, args, kwargs):
+    args.assert_sizeof(toward.symbol, 1)
+    sub, = args.list
+    path = os.path.join(plan.io.dir_main, '%s.pt' % sub.symbol)
+    Exporter.save(sub, path)
+    return path
@@ -1,7 +1,7 @@
 from mp.core import extension as _ext
 
 
-@_ext.static('abs')
+@_ext.static('abs', pure=True)
 def method_math_abs(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1)
     x, = args.get_value()
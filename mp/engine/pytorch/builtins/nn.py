@@ -14,7 +14,7 @@ def _int_or_tuple(value):
 # -----------------------------
 
 
-@_ext.static('__nn_dense')
+@_ext.static('__nn_dense', pure=True)
 def method_nn_dense(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 3)
     x, weight, bias = args.get_value()
@@ -27,7 +27,7 @@ def method_nn_dense(plan, toward, args, kwargs):
 # -----------------------------
 
 
-@_ext.static('__nn_cross_entropy')
+@_ext.static('__nn_cross_entropy', pure=True)
 def method_nn_cross_entropy(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 2)
     x, y = args.get_value()
@@ -39,21 +39,21 @@ def method_nn_cross_entropy(plan, toward, args, kwargs):
 # -----------------------------
 
 
-@_ext.static('__nn_sigmoid')
+@_ext.static('__nn_sigmoid', pure=True)
 def method_nn_sigmoid(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1)
     x, = args.get_value()
     x = x.sigmoid()
     return x
 
-@_ext.static('__nn_tanh')
+@_ext.static('__nn_tanh', pure=True)
 def method_nn_tanh(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1)
     x, = args.get_value()
     x = x.tanh()
     return x
 
-@_ext.static('__nn_softmax')
+@_ext.static('__nn_softmax', pure=True)
 def method_nn_softmax(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 2)
     x, dim = args.get_value()
@@ -63,7 +63,7 @@ def method_nn_softmax(plan, toward, args, kwargs):
     x = _F.softmax(x, dim)
     return x
 
-@_ext.static('__nn_relu')
+@_ext.static('__nn_relu', pure=True)
 def method_nn_relu(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1)
     x, = args.get_value()
@@ -75,7 +75,7 @@ def method_nn_relu(plan, toward, args, kwargs):
 # -----------------------------
 
 
-@_ext.static('__nn_conv1d')
+@_ext.static('__nn_conv1d', pure=True)
 def method_nn_conv1d(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 6)
     x, weight, bias, stride, padding, dilation = args.get_value()
@@ -84,10 +84,83 @@ def method_nn_conv1d(plan, toward, args, kwargs):
     return x
 
 
-@_ext.static('__nn_conv2d')
+@_ext.static('__nn_conv2d', pure=True)
 def method_nn_conv2d(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 6)
     x, weight, bias, stride, padding, dilation = args.get_value()
     bias = args.assert_false_to_none(bias)
     x = _F.conv2d(x, weight, bias, _int_or_tuple(stride), int(padding), int(dilation))
     return x
+
+# -----------------------------
+# Fused Layers (Plan.FUSIONS)
+# -----------------------------
+
+def _dense(plan, toward, args, kwargs):
+    args.assert_sizeof(toward.symbol, 3)
+    x, weight, bias = args.get_value()
+    bias = args.assert_false_to_none(bias)
+    # addmm on matrices (as linear does)
+    if bias is not None and x.dim() == 2:
+        return _torch.addmm(bias, x, weight.t())
+    return _F.linear(x, weight, bias)
+
+
+# activations in place (on the new output of the layers)
+@_ext.static('__nn_dense_relu', pure=True)
+def method_nn_dense_relu(plan, toward, args, kwargs):
+    return _F.relu_(_dense(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_dense_sigmoid', pure=True)
+def method_nn_dense_sigmoid(plan, toward, args, kwargs):
+    return _torch.sigmoid_(_dense(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_dense_tanh', pure=True)
+def method_nn_dense_tanh(plan, toward, args, kwargs):
+    return _torch.tanh_(_dense(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_conv1d_relu', pure=True)
+def method_nn_conv1d_relu(plan, toward, args, kwargs):
+    return _F.relu_(method_nn_conv1d(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_conv1d_sigmoid', pure=True)
+def method_nn_conv1d_sigmoid(plan, toward, args, kwargs):
+    return _torch.sigmoid_(method_nn_conv1d(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_conv1d_tanh', pure=True)
+def method_nn_conv1d_tanh(plan, toward, args, kwargs):
+    return _torch.tanh_(method_nn_conv1d(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_conv2d_relu', pure=True)
+def method_nn_conv2d_relu(plan, toward, args, kwargs):
+    return _F.relu_(method_nn_conv2d(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_conv2d_sigmoid', pure=True)
+def method_nn_conv2d_sigmoid(plan, toward, args, kwargs):
+    return _torch.sigmoid_(method_nn_conv2d(plan, toward, args, kwargs))
+
+
+@_ext.static('__nn_conv2d_tanh', pure=True)
+def method_nn_conv2d_tanh(plan, toward, args, kwargs):
+    return _torch.tanh_(method_nn_conv2d(plan, toward, args, kwargs))
+
+
+# (activation, layer) -> fused builtin
+FUSIONS = {
+    ('__nn_relu', '__nn_dense'): '__nn_dense_relu',
+    ('__nn_sigmoid', '__nn_dense'): '__nn_dense_sigmoid',
+    ('__nn_tanh', '__nn_dense'): '__nn_dense_tanh',
+    ('__nn_relu', '__nn_conv1d'): '__nn_conv1d_relu',
+    ('__nn_sigmoid', '__nn_conv1d'): '__nn_conv1d_sigmoid',
+    ('__nn_tanh', '__nn_conv1d'): '__nn_conv1d_tanh',
+    ('__nn_relu', '__nn_conv2d'): '__nn_conv2d_relu',
+    ('__nn_sigmoid', '__nn_conv2d'): '__nn_conv2d_sigmoid',
+    ('__nn_tanh', '__nn_conv2d'): '__nn_conv2d_tanh',
+}
@@ -21,12 +21,15 @@ def has_trainer_inited(plan):
 
 @_ext.static('step')
 def method_optim_step(plan, toward, args, kwargs):
-    args.assert_sizeof(toward.symbol, 2)
+    args.assert_sizeof(toward.symbol, 2, +1)
     # init
     if not has_trainer_inited(plan):
-        optim, loss_graph = args.list
+        optim, loss_graph = args.list[:2]
         plan.event('get optim', optim.get_value())
         plan.event('get loss graph', loss_graph)
+        # step(optim, loss, n) : n micro-batches for each step
+        if len(args.list) >= 3:
+            plan.event('get accumulation', int(args.list[2].get_value()))
         # for events & init
         loss = loss_graph.get_value()
         return loss
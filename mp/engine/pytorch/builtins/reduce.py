@@ -2,35 +2,35 @@ from mp.core import extension as _ext
 from mp.engine.pytorch.framework import torch as _torch
 
 
-@_ext.static('max')
+@_ext.static('max', pure=True)
 def method_reduce_max(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 2, +1)
     args = args.get_value()
     return _torch.max(*args)
 
 
-@_ext.static('min')
+@_ext.static('min', pure=True)
 def method_reduce_min(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 2, +1)
     args = args.get_value()
     return _torch.min(*args)
 
 
-@_ext.static('sum')
+@_ext.static('sum', pure=True)
 def method_reduce_sum(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1, +1)
     x, *dim = args.get_value()
     return _torch.sum(x, *dim)
 
 
-@_ext.static('mean')
+@_ext.static('mean', pure=True)
 def method_reduce_mean(plan, toward, args, kwargs):
     args.assert_sizeof(toward.symbol, 1, +1)
     x, *dim = args.get_value()
     return _torch.mean(x, *dim)
 
 
-@_ext.static('__reduce_slice')
+@_ext.static('__reduce_slice', pure=True)
 def method_reduce_slice(plan, toward, args, kwargs):
     symbol = '[slice]' if toward is None else toward.symbol
     args.assert_sizeof(symbol, 3)
@@ -38,7 +38,7 @@ def method_reduce_slice(plan, toward, args, kwargs):
     return slice(*args)
 
 
-@_ext.static('__reduce_dim')
+@_ext.static('__reduce_dim', pure=True)
 def method_reduce_dim(plan, toward, args, kwargs):
     symbol = '[dim]' if toward is None else toward.symbol
     args.assert_sizeof(symbol, 1)
@@ -46,7 +46,7 @@ def method_reduce_dim(plan, toward, args, kwargs):
     return sub.dim()
 
 
-@_ext.static('__reduce_sizeof')
+@_ext.static('__reduce_sizeof', pure=True)
 def method_reduce_sizeof(plan, toward, args, kwargs):
     symbol = '[sizeof]' if toward is None else toward.symbol
     args.assert_sizeof(symbol, 2)
@@ -54,7 +54,7 @@ def method_reduce_sizeof(plan, toward, args, kwargs):
     return sub.shape[axis]
 
 
-@_ext.static('__reduce_transpose')
+@_ext.static('__reduce_transpose', pure=True)
 def method_reduce_transpose(plan, toward, args, kwargs):
     symbol = '[transpose]' if toward is None else toward.symbol
     args.assert_sizeof(symbol, 3)
@@ -62,7 +62,7 @@ def method_reduce_transpose(plan, toward, args, kwargs):
     return sub.transpose(*args)
 
 
-@_ext.static('__reduce_indexed')
+@_ext.static('__reduce_indexed', pure=True)
 def method_reduce_indexed(plan, toward, args, kwargs):
     symbol = '[indexed]' if toward is None else toward.symbol
     args.assert_sizeof(symbol, 2, +1)
@@ -86,7 +86,7 @@ def method_reduce_indexed(plan, toward, args, kwargs):
     return sub[tuple(args)]
 
 
-@_ext.static('__reduce_view')
+@_ext.static('__reduce_view', pure=True)
 def method_reduce_view(plan, toward, args, kwargs):
     symbol = '[view]' if toward is None else toward.symbol
     args.assert_sizeof(symbol, 1, +1)
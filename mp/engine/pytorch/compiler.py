@@ -0,0 +1,47 @@
+from mp.core.compiler import CompiledGraph
+from mp.engine.pytorch.builtins.nn import FUSIONS
+from mp.engine.pytorch.export import Exporter
+from mp.engine.pytorch.framework import torch as _torch
+
+
+class _StaticGraph(CompiledGraph):
+    # builtins taking the shapes, indices and hyperparameters by int()
+    STATIC = frozenset(['__nn_softmax', '__nn_conv1d', '__nn_conv2d', 'sum', 'mean',
+                        '__reduce_slice', '__reduce_sizeof', '__reduce_transpose', '__reduce_indexed', '__reduce_view'] +
+                       [name for (activation, layer), name in FUSIONS.items() if layer != '__nn_dense'])
+
+    # python numbers are specialized by torch.compile (tensors are traced)
+    @classmethod
+    def _static(cls, name: str, value):
+        if name not in cls.STATIC:
+            return value
+        if type(value) is slice:
+            return slice(*(cls._static(name, v) for v in (value.start, value.stop, value.step)))
+        if type(value) is _torch.Tensor and value.dim() == 0 and not value.requires_grad:
+            return value.item()
+        return value
+
+
+class TorchCompiledGraph:
+    BACKEND = 'inductor'
+
+    def __init__(self, root, index):
+        self.inputs = Exporter.find_inputs(index)
+        self.graph = _StaticGraph(root, index, self.inputs)
+        # recompiled only if the structure is changed
+        self.digest = None
+        self.compiles = 0
+        self._function = None
+
+    def __call__(self):
+        function = self.graph.function
+        if self.graph.digest != self.digest:
+            self._function = _torch.compile(function, backend=self.BACKEND)
+            self.digest = self.graph.digest
+            self.compiles += 1
+        # the next batches
+        inputs = [node.get_value() for node in self.inputs]
+        return self._function(*inputs)
+
+    def release(self):
+        self.graph.release()
@@ -3,10 +3,19 @@ from mp.engine.pytorch.framework import torch as _torch
 
 class Device:
     get = None
+    # mixed precision (the weights are kept in float32)
+    AUTOCAST_TYPE = _torch.bfloat16
 
-    def __init__(self, use_cuda: bool):
+    def __init__(self, use_cuda: bool, use_autocast: bool = False):
         self._device = _torch.device('cuda' if use_cuda else 'cpu')
+        self._use_autocast = use_autocast
         self.__class__.get = self
 
     def __call__(self):
         return self._device
+
+    # the forward pass of the training steps
+    def autocast(self, enabled: bool = None):
+        if enabled is None:
+            enabled = self._use_autocast
+        return _torch.autocast(self._device.type, dtype=self.AUTOCAST_TYPE, enabled=enabled)
@@ -0,0 +1,94 @@
+import re as _re
+
+from mp.core.attribute import Attr, AttrMethod, CacheIndex
+from mp.core.compiler import CompiledGraph
+from mp.core.error import NotExportableError
+from mp.engine.pytorch.framework import torch as _torch
+
+
+class _Tracer(_torch.fx.proxy.GraphAppendingTracer):
+    def __init__(self, graph, module):
+        super().__init__(graph)
+        self.module = module
+        self._names = dict()
+
+    # tensors become parameters (trainable) or buffers
+    def create_arg(self, a):
+        if isinstance(a, _torch.Tensor):
+            name = self._names.get(id(a))
+            if name is None:
+                name = '%s%d' % ('weight' if a.requires_grad else 'constant', len(self._names))
+                value = a.detach().clone()
+                if a.requires_grad:
+                    self.module.register_parameter(name, _torch.nn.Parameter(value))
+                else:
+                    self.module.register_buffer(name, value)
+                self._names[id(a)] = name
+            return self.graph.get_attr(name)
+        return super().create_arg(a)
+
+
+class Exporter:
+    # builtins given as the arguments
+    INPUTS = ('batch',)
+
+    @classmethod
+    def export(cls, root) -> _torch.fx.GraphModule:
+        index = CacheIndex(root)
+        inputs = cls.find_inputs(index)
+        compiled = CompiledGraph(root, index, inputs)
+        # the interpreter cannot calculate the proxies
+        if compiled.fallbacks > 0:
+            raise NotExportableError(root.symbol)
+
+        module = _torch.nn.Module()
+        graph = _torch.fx.Graph()
+        tracer = _Tracer(graph, module)
+        names = set()
+        proxies = [_torch.fx.Proxy(graph.placeholder(cls._input_name(index, node, names)), tracer) for node in inputs]
+        try:
+            result = compiled(*proxies)
+        finally:
+            index.invalidate()
+        graph.output(tracer.create_arg(result))
+        return _torch.fx.GraphModule(module, graph, class_name='MPGraph')
+
+    @classmethod
+    def save(cls, root, path: str):
+        module = cls.export(root).cpu()
+        try:
+            scripted = _torch.jit.script(module)
+        # traced with the current inputs instead
+        except Exception:
+            index = CacheIndex(root)
+            inputs = [cls._last_value(node).cpu() for node in cls.find_inputs(index)]
+            scripted = _torch.jit.trace(module, tuple(inputs))
+        scripted.save(path)
+        return scripted
+
+    @classmethod
+    def find_inputs(cls, index: CacheIndex) -> list:
+        return [node for node in index.nodes.values() if cls._is_input(node)]
+
+    @classmethod
+    def _is_input(cls, node) -> bool:
+        return type(node) is AttrMethod and node.event_names is not None and node.event_names[0] in cls.INPUTS
+
+    # without moving to the next batch
+    @classmethod
+    def _last_value(cls, node):
+        return node.value if node.value is not None else node.get_value()
+
+    # named after the variable (x = batch(...))
+    @classmethod
+    def _input_name(cls, index: CacheIndex, node, names: set) -> str:
+        symbol = node.symbol
+        for parent in index.parents.get(id(node), ()):
+            if type(parent) is Attr:
+                symbol = parent.symbol
+                break
+        name = _re.sub(r'\W+', '_', symbol).strip('_') or 'input'
+        while name in names:
+            name += '_'
+        names.add(name)
+        return name
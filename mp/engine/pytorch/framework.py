@@ -10,6 +10,7 @@ MAP_NUM_TYPE = {
     'f16': torch.float16,
     'f32': torch.float32,
     'f64': torch.float64,
+    'bf16': torch.bfloat16,
 }
 
 
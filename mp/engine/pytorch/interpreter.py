@@ -1,4 +1,6 @@
 from mp.core import Interpreter as _Interpreter
+from mp.core.expression import Expression as Exp
+from mp.engine.pytorch.compiler import TorchCompiledGraph
 from mp.engine.pytorch.device import Device
 from mp.engine.pytorch.plan import Plan as _Plan
 
@@ -34,7 +36,12 @@ HEADER = '''
 
 class Interpreter(_Interpreter):
 
-    def __init__(self, dir_process: str = './', use_cuda: bool = False, *args, **kwargs):
-        Device(use_cuda)
-        super().__init__(dir_process, _Plan)
+    def __init__(self, dir_process: str = './', use_cuda: bool = False, use_compile: bool = False,
+                 use_autocast: bool = False, *args, **kwargs):
+        device = Device(use_cuda, use_autocast)
+        super().__init__(dir_process, _Plan, **kwargs)
+        # training steps run by torch.compile
+        if use_compile:
+            Exp.EVENT.add('compile loss graph', TorchCompiledGraph, unique=True)
+        Exp.EVENT.add('autocast forward', device.autocast, unique=True)
         self(HEADER)
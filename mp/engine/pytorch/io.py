@@ -6,8 +6,9 @@ from mp.engine.pytorch.framework import torch as _torch
 class IO(io.IO):
 
     @classmethod
-    def _load_binary_raw(cls, path):
-        raw_np = super()._load_binary_raw(path)
+    def _load_binary_raw(cls, path, mmap: bool = False):
+        raw_np = super()._load_binary_raw(path, mmap)
+        # shares the memory (mapped) on CPU
         raw_torch = _torch.from_numpy(raw_np).to(Device.get())
         return raw_torch
 
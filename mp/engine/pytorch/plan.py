@@ -13,6 +13,8 @@ class Plan(_Plan):
 
     MAP_NUM_TYPE = framework.MAP_NUM_TYPE
 
+    FUSIONS = _builtins.nn.FUSIONS
+
     def _new_const(self, toward):
         if toward.num_type == Exp.BOOL:
             return bool(toward.value)
@@ -5,6 +5,9 @@ from mp.trainer import StandardTrainer as Trainer
 
 
 class Monitor:
+    # the loss is shown (synchronized) once in the steps
+    FLUSH_STEPS = 10
+
     def __init__(self):
         Exp.EVENT.add('init monitor', self._init, unique=True)
         Exp.EVENT.add('begin training', self._begin, unique=True)
@@ -14,6 +17,7 @@ class Monitor:
         self._name = None
         self._tqdm = None
         self._length = None
+        self._steps = 0
 
         self._trainer = None
         self._optim = None
@@ -24,14 +28,29 @@ class Monitor:
             return int(self._args.list[1].get_value())
         return 1
 
+    # trace(..., aot=true, autocast=true)
+    @classmethod
+    def _get_option(cls, kwargs, name: str):
+        if kwargs is None or kwargs.dict.get(name) is None:
+            return None
+        return bool(kwargs.dict[name].get_value())
+
     def _update_batch_length(self):
         if self._length is None:
-            self._length = self._get_batch_length()
+            self._length = self._get_num_steps()
             if self._tqdm is not None:
                 self._tqdm.total = self._length
 
     def _begin_epoch(self):
-        self._tqdm = tqdm(desc=self._name, total=self._get_batch_length())
+        self._tqdm = tqdm(desc=self._name, total=self._get_num_steps())
+        self._steps = 0
+
+    # optimizer steps (of several micro-batches)
+    def _get_num_steps(self):
+        length = self._get_batch_length()
+        if length is None:
+            return None
+        return -(-length // self._trainer.accumulation)
 
     def _end_epoch(self, loss):
         self._tqdm.close()
@@ -47,10 +66,11 @@ class Monitor:
 
     # ------------ For Events -------------------------------
 
-    def _init(self, args):
+    def _init(self, args, kwargs=None):
         self._args = args
         self._name = self._args.list[0].symbol
-        self._trainer = Trainer()
+        self._trainer = Trainer(aot=bool(self._get_option(kwargs, 'aot')),
+                                autocast=self._get_option(kwargs, 'autocast'))
         # Init events & optimizer & loss graph
         self._args.list[0].get_value()
         self._args.list[0].remove_cache()
@@ -63,7 +83,11 @@ class Monitor:
             self._end_epoch(loss)
         return loss
 
+    # loss : the mean of the step (converted by float)
     def _next_step(self, trainer, loss):
         self._update_batch_length()
+        self._steps += 1
         if self._tqdm is not None:
+            if self._steps % self.FLUSH_STEPS == 0:
+                self._tqdm.set_postfix(loss=float(loss), refresh=False)
             self._tqdm.update()
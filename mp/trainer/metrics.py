@@ -0,0 +1,31 @@
+class Metric:
+    # running mean kept on the device (synchronized when converted)
+    def __init__(self):
+        self._sum = None
+        self.count = 0
+
+    def add(self, value):
+        if hasattr(value, 'detach'):
+            # summed in float64 (a bfloat16 sum stops growing)
+            value = value.detach().double()
+        self._sum = value if self._sum is None else self._sum + value
+        self.count += 1
+
+    def reset(self):
+        self._sum = None
+        self.count = 0
+
+    # a copy (for the events)
+    def snapshot(self):
+        metric = Metric()
+        metric._sum = self._sum
+        metric.count = self.count
+        return metric
+
+    def __float__(self):
+        if self.count == 0:
+            return float('nan')
+        return float(self._sum) / self.count
+
+    def __repr__(self):
+        return repr(float(self))
@@ -1,35 +1,102 @@
+from contextlib import nullcontext
+
+from mp.core.attribute import CacheIndex, MemoryPlan
+from mp.core.compiler import CompiledGraph
 from mp.core.expression import Expression as Exp
+from mp.trainer.metrics import Metric
 
 
 class StandardTrainer:
-    def __init__(self):
+    def __init__(self, aot: bool = False, autocast: bool = None):
         self._optim = None
         self._loss_graph = None
+        self._cache_index = None
+        self._memory_plan = None
+        # compile the loss graph after the first step
+        self._aot = aot or Exp.EVENT.find_unique('compile loss graph', True) is not None
+        self._compiled = None
+        # mixed precision (None follows the engine)
+        self._autocast = autocast
+        # micro-batches for each step
+        self.accumulation = 1
 
         Exp.EVENT.add('get optim', self._get_optim, unique=True)
         Exp.EVENT.add('get loss graph', self._get_loss_graph, unique=True)
+        Exp.EVENT.add('get accumulation', self._get_accumulation, unique=True)
         Exp.EVENT.add('has trainer inited', self._alive)
 
     def one_epoch(self):
         Exp.EVENT('reset batch')
-        loss_sum = 0.
-        count = 0
+        # find the attributes changed between steps (once)
+        if self._cache_index is None:
+            self._cache_index = CacheIndex(self._loss_graph)
+            self._memory_plan = MemoryPlan(self._cache_index)
+        # the losses are not converted until read
+        epoch_loss = Metric()
+        step_loss = Metric()
         # Begin training
         while self._has_next_batch():
-            self._loss_graph.remove_cache()
-            loss = self._loss_graph.get_value()
-            loss_sum += float(loss)
-            self._optim.zero_grad()
-            loss.backward()
-            self._optim.step()
+            with self._autocast_forward():
+                loss = self._forward()
+            if step_loss.count == 0:
+                self._optim.zero_grad()
+            # mean of the micro-batches
+            (loss / self.accumulation).backward()
+            self._release()
             # add count
-            count += 1
+            epoch_loss.add(loss)
+            step_loss.add(loss)
+            if step_loss.count < self.accumulation and self._has_next_batch():
+                continue
+            # the last step may have fewer micro-batches
+            if step_loss.count < self.accumulation:
+                self._scale_grad(self.accumulation / step_loss.count)
+            self._optim.step()
             # Transfer status to monitor
-            Exp.EVENT('next step', self, float(loss))
+            Exp.EVENT('next step', self, step_loss.snapshot())
+            step_loss.reset()
+        # the compiled steps leave the interpreter's values behind
+        if self._compiled is not None:
+            self._cache_index.invalidate()
         # get loss
-        if count == 0:
+        if epoch_loss.count == 0:
             return None
-        return loss_sum / count
+        return float(epoch_loss)
+
+    def _forward(self):
+        if self._compiled is not None:
+            return self._compiled()
+        self._cache_index.invalidate()
+        loss = self._loss_graph.get_value()
+        if self._aot:
+            self._compiled = self._compile()
+        return loss
+
+    # the intermediates are not needed after backward
+    def _release(self):
+        self._memory_plan.release()
+        if self._compiled is not None:
+            self._compiled.release()
+
+    def _scale_grad(self, scale: float):
+        for group in self._optim.param_groups:
+            for param in group['params']:
+                if param.grad is not None:
+                    param.grad.mul_(scale)
+
+    # the engines give the context (if supported)
+    def _autocast_forward(self):
+        context = Exp.EVENT('autocast forward', self._autocast)
+        if context == []:
+            context = nullcontext()
+        return context
+
+    # the engines may compile it in their own way
+    def _compile(self):
+        compiled = Exp.EVENT('compile loss graph', self._loss_graph, self._cache_index)
+        if compiled == []:
+            compiled = CompiledGraph(self._loss_graph, self._cache_index)
+        return compiled
 
     def _get_optim(self, optim):
         Exp.EVENT.remove('get optim')
@@ -39,6 +106,10 @@ class StandardTrainer:
         Exp.EVENT.remove('get loss graph')
         self._loss_graph = loss_graph
 
+    def _get_accumulation(self, accumulation: int):
+        Exp.EVENT.remove('get accumulation')
+        self.accumulation = max(1, accumulation)
+
     def _alive(self):
         return self._optim is not None and self._loss_graph is not None
 
@@ -0,0 +1,357 @@
+from mp.core.interpreter import Interpreter
+
+# --------------------------------------------------------------------------
+#             METHOD
+# --------------------------------------------------------------------------
+
+
+def _curdir():
+    import os
+    return os.path.abspath(os.path.join(__file__, os.path.pardir))
+
+
+def _scripts():
+    import glob
+    import os
+    lines = []
+    for path in glob.glob(os.path.join(_curdir(), os.path.pardir, '**', '*.mp'), recursive=True):
+        with open(path, 'r', encoding='utf-8') as f:
+            lines += f.read().split('\n')
+    return lines
+
+
+def _random_lines(num_lines: int, seed: int = 0):
+    import random
+    alphabet = 'ab1 .e\t()[]{}+-*/@%<>=:!,#\\^_$'
+    rand = random.Random(seed)
+    for _ in range(num_lines):
+        yield ''.join(rand.choice(alphabet) for _ in range(rand.randint(0, 12)))
+
+# --------------------------------------------------------------------------
+#             TEST
+# --------------------------------------------------------------------------
+
+
+def test_lexer_parity():
+    for line in _scripts() + list(_random_lines(5000)):
+        assert Interpreter._scanner(line) == Interpreter._scanner_legacy(line), line
+
+
+def test_parse_cache():
+    interpreter = Interpreter(_curdir())
+    script = 'a = 3\nb = a + 4\nprint b'
+    first = list(interpreter.code_to_data(script))
+    misses = interpreter.parse_cache.misses
+    second = list(interpreter.code_to_data(script))
+    assert interpreter.parse_cache.misses == misses
+    assert interpreter.parse_cache.hits >= 3
+    assert all(a is b for a, b in zip(first, second))
+
+
+def test_io_compiled(tmp_path):
+    import os
+    from mp.core.io import IO
+    interpreter = Interpreter(str(tmp_path))
+    with open(os.path.join(str(tmp_path), 'lib.mp'), 'w') as f:
+        f.write('a = 3\nb = a + 4')
+    values = IO(str(tmp_path), code_to_data=interpreter.code_to_data).get('lib')
+    assert len(values) == 2
+    assert os.path.exists(os.path.join(str(tmp_path), 'lib.mpc'))
+
+    # load tokens without parsing
+    def _no_parse(message):
+        raise AssertionError(message)
+    values = IO(str(tmp_path), code_to_data=_no_parse).get('lib')
+    assert len(values) == 2
+
+    # invalidated by modification
+    with open(os.path.join(str(tmp_path), 'lib.mp'), 'w') as f:
+        f.write('a = 3\nb = a + 4\nc = b')
+    values = IO(str(tmp_path), code_to_data=interpreter.code_to_data).get('lib')
+    assert len(values) == 3
+
+
+def test_io_compiled_untrusted(tmp_path):
+    import os
+    import pickle
+    from mp.core.io import IO
+    from mp.core.token import Token
+    interpreter = Interpreter(str(tmp_path))
+    with open(os.path.join(str(tmp_path), 'lib.mp'), 'w') as f:
+        f.write('a = 3\nb = f(a, 4.5)\nprint b')
+    parsed = [Token.to_raw(line) for line in interpreter.code_to_data('a = 3\nb = f(a, 4.5)\nprint b')]
+    io = IO(str(tmp_path), code_to_data=interpreter.code_to_data)
+    assert [Token.to_raw(line) for line in io.get('lib')] == parsed
+    # loaded without parsing
+    assert [Token.to_raw(line) for line in IO(str(tmp_path), code_to_data=None)._read_compiled(
+        os.path.join(str(tmp_path), 'lib.mpc'))[1]] == parsed
+
+    # a pickle is never loaded (parsed again)
+    called = []
+
+    class Payload:
+        def __reduce__(self):
+            return called.append, ('loaded',)
+    stat = os.stat(os.path.join(str(tmp_path), 'lib.mp'))
+    for raw in (pickle.dumps({'version': IO.COMPILED_VERSION, 'mtime': stat.st_mtime_ns, 'size': stat.st_size})
+                + pickle.dumps(Payload()), b'{"header": {"version": 2}, "data": [[1, "x"]]}', b'\x80\x04{'):
+        with open(os.path.join(str(tmp_path), 'lib.mpc'), 'wb') as f:
+            f.write(raw)
+        assert [Token.to_raw(line) for line in io.get('lib')] == parsed
+    assert called == []
+
+
+def test_parser_parity():
+    from mp.core.parser import Parser
+    from mp.engine.pytorch.interpreter import HEADER
+    invalid = ['.', '.a = 1', '\\a', '.5', '3 = a', 'x = (.5)', '(,)', 'x = (, a)', 'x = {}', 'x = [.5]', 'x = (a',
+               'x = a +', 'x = a ! b', 'from a', 'print from a', 'x += 1, 2', 'x := a, b']
+    # := and in-place operators on shells () and slices
+    inplace = ['x := (1)', 'w += (1)', 'x += ((2.5))', 'w := ((x[1e-3, b c]))', 'x -= (a)', 'x += (1, 2)',
+               'a, b += 1', 'x += a(:)', 'x -= a(:2)', 'x += a(1:)', 'x -= a(::)', 'x += a(:, :)', 'x := a(1:2)',
+               'x -= (a(:))', 'x = a + b(1:)']
+
+    # the tree, or the type of the error
+    def _parse(parse, tokens):
+        try:
+            return repr(parse(tokens))
+        except Exception as e:
+            return type(e)
+    for line in _scripts() + HEADER.split('\n') + inplace + invalid:
+        tokens = Interpreter._scanner(line)
+        legacy = _parse(lambda x: Interpreter._semantic_analysis(*Interpreter._parser(x)), tokens)
+        assert _parse(Parser.parse, tokens) == legacy, line
+    for line in invalid:
+        assert type(_parse(Parser.parse, Interpreter._scanner(line))) is type, line
+
+
+def test_parser_precedence():
+    from mp.core.parser import Parser
+    for line, expected in [('x = b * c ** d + e', 'x = ((b * (c ** d)) + e)'),
+                           ('x = a - b - c', 'x = ((a - b) - c)'),
+                           ('x = a == b + c * d', 'x = (a == (b + (c * d)))'),
+                           ('x = (-1 * b - d) / 2', 'x = (((-1 * b) - d) / 2)'),
+                           ]:
+        def _show(token):
+            if token.data_type == token.TYPE_NUMBER:
+                return str(token.args[0])
+            if token.data_type == token.TYPE_VARIABLE:
+                return token.name
+            left, right = [_show(arg) for arg in token.args]
+            if token.name == '=':
+                return '%s = %s' % (left, right)
+            return '(%s %s %s)' % (left, token.name, right)
+        assert _show(Parser.parse(Interpreter._scanner(line))) == expected, line
+
+    interpreter = Interpreter(_curdir(), use_pratt_parser=True)
+    data = interpreter.line_to_data('x = b * c ** d + e')
+    assert data.args[1].name == '+'
+
+
+def test_literal_parity():
+    import random
+    from mp.core.literal import Literal
+    alphabet = '0123456789.eE+-bifBIF _\tnax'
+    rand = random.Random(0)
+    words = ['1', '-1', '1.5', '1e-3', '1b', '1.5b', '1bias', '3i8', '1.7i32', '2f16', '1i08', '1bf16', '2.5BF16', '1bf32', '1bf016', 'inf', 'nan i8',
+             'weight conv 1', ' 8', '+.5e+3f64']
+    words += [''.join(rand.choice(alphabet) for _ in range(rand.randint(0, 7))) for _ in range(20000)]
+    for word in words:
+        try:
+            expected = repr(Literal._classify_reference(word))
+        except OverflowError:
+            continue
+        assert repr(Literal.classify(word)) == expected, word
+        # interned
+        assert repr(Literal.classify(word)) == expected, word
+
+
+def test_graph_index():
+    import random
+    interpreter = Interpreter(_curdir())
+    graph = interpreter.plan.graph
+    names = ['a', 'b', 'c', 'u', 'v']
+    rand = random.Random(0)
+
+    def _expr(depth=0):
+        choice = rand.random()
+        if depth > 1 or choice < 0.4:
+            return rand.choice(names + ['1', '2.'])
+        if choice < 0.7:
+            return '%s %s %s' % (_expr(depth + 1), rand.choice('+-*/'), _expr(depth + 1))
+        if choice < 0.8:
+            return 'if(%s, %s, %s)' % (_expr(depth + 1), _expr(depth + 1), _expr(depth + 1))
+        return 'f(%s)' % _expr(depth + 1)
+
+    for _ in range(60):
+        if rand.random() < 0.1:
+            line = 'f = def(_x, _x * %s)' % _expr(1)
+        else:
+            line = '%s %s %s' % (rand.choice(names), rand.choice(['=', '=', ':=', '+=']), _expr())
+        try:
+            interpreter.plan.push(interpreter.line_to_data(line))
+        except Exception:
+            pass
+        for name in list(graph.vars.keys()) + names:
+            assert graph.is_used(name) == graph._is_used_scan(name), (line, name)
+
+
+def test_graph_index_scoped():
+    idle = Interpreter(_curdir())
+    interpreter = Interpreter(_curdir())
+    mutated, containers = len(idle.plan.graph._mutated), len(idle.plan.graph._containers)
+    for i in range(200):
+        interpreter('a%d = 1 + %d\nb = a%d * 2\ndelete a%d' % (i, i, i, i))
+    # changes are reported to the graph walking the nodes only
+    assert len(idle.plan.graph._mutated) == mutated
+    assert len(idle.plan.graph._containers) == containers
+    assert interpreter.plan.graph.is_used('b') == interpreter.plan.graph._is_used_scan('b')
+
+
+def test_data_digest():
+    from mp.core.data import Variable
+    interpreter = Interpreter(_curdir())
+    graph = interpreter.plan.graph
+    for line in _scripts():
+        try:
+            interpreter.plan.push(interpreter.line_to_data(line))
+        except Exception:
+            pass
+        digests = {name: var.digest for name, var in graph.vars.items()}
+        # recalculate all
+        for var in graph.vars.values():
+            _forget(var)
+        codes = dict()
+        for name, var in graph.vars.items():
+            assert var.digest == digests[name], (line, name)
+            assert codes.setdefault(var.digest, var.encode()) == var.encode(), (line, name)
+
+    # a change drops the digests of the node and its ancestors only
+    other = Interpreter(_curdir())
+    other.plan.push(other.line_to_data('y = 1 + 2'))
+    other_var = other.plan.graph.vars['y']
+    other_digest = other_var.digest
+    interpreter.plan.push(interpreter.line_to_data('x = (a + 1) * (b + 2)'))
+    var = interpreter.plan.graph.vars['x']
+    digest = var.digest
+    left, right = var.toward.sub, var.toward.obj
+    left_digest = left.digest
+    right.obj.value = 3
+    assert var._digest is None and right._digest is None
+    assert left._digest == left_digest and other_var._digest == other_digest
+    assert var.digest != digest and var.encode() != 'x = (a + 1) * (b + 2)'
+
+
+def _forget(var, visited=None):
+    visited = set() if visited is None else visited
+    if var in visited:
+        return
+    visited.add(var)
+    var._digest = None
+    for node in var.neighbors():
+        _forget(node, visited)
+
+
+def test_event_index():
+    import random
+    from mp.core.event import Event
+    event = Event()
+    # reference: scan all units in order
+    units = []
+    uniques = dict()
+
+    def _remove(name):
+        uniques.pop(name, None)
+        found = [unit for unit in units if unit.name == name]
+        if len(found) > 0:
+            units.remove(found[0])
+
+    names = ['a', 'b', 'a.x', 'b.y', 'ab']
+    patterns = [r'^a$', r'^a[.].*', r'b', r'^(a|b)$', r'x$']
+    rand = random.Random(0)
+    for step in range(400):
+        choice = rand.random()
+        if choice < 0.35:
+            is_regex = rand.random() < 0.6
+            name = rand.choice(patterns if is_regex else names)
+            unique = rand.random() < 0.3
+            event.add(name, lambda i=step: i, unique=unique, hidden=rand.random() < 0.3, is_regex=is_regex)
+            if unique:
+                _remove(name)
+            units.append(list(event._events.values())[-1])
+            if unique:
+                uniques[name] = units[-1]
+        elif choice < 0.7:
+            name = rand.choice(names + patterns)
+            event.remove(name)
+            _remove(name)
+        name, hidden = rand.choice(names), rand.random() < 0.5
+        matched = [unit for unit in units if unit.match_name(name, hidden)]
+        expected = []
+        for unit in matched:
+            expected.append(unit())
+            if unit.unique:
+                expected = expected[-1]
+                break
+        assert event(name, hidden=hidden) == expected, step
+        assert event.find(name, hidden) is (matched[0] if len(matched) > 0 else None), step
+        matched = [unit for unit in uniques.values() if unit.match_name(name, hidden)]
+        assert event.find_unique(name, hidden) is (matched[0] if len(matched) > 0 else None), step
+
+    # bounded (distinct names in a long session)
+    for i in range(Event.RESOLVED_CACHE_SIZE * 2):
+        event.find_unique('name %d' % i)
+    assert len(event._resolved) == Event.RESOLVED_CACHE_SIZE
+
+    # patterns with groups are not renumbered in the prefilter
+    event = Event()
+    event.add(r'^(a|b)$', lambda: 1, is_regex=True)
+    event.add(r'^(x)\1$', lambda: 2, is_regex=True)
+    event.add(r'y', lambda: 3, is_regex=True)
+    assert event('xx') == [2] and event('b') == [1] and event('xy') == [3] and event('x') == []
+
+
+def test_event_binding():
+    from mp.core.event import Event
+    event = Event()
+    event.add('f', lambda x: x + 1)
+    f = event.bind('f')
+    assert f(1) == [2]
+    resolved = f._resolved
+    # the other names
+    event.add('g', lambda x: x)
+    assert f(1) == [2] and f._resolved is resolved
+    # registered again
+    event.add('f', lambda x: x + 2, unique=True)
+    assert f(1) == 3 and f._resolved is not resolved
+    event.remove('f')
+    event.add(r'^(f|h)$', lambda x: x * 10, is_regex=True)
+    assert f(1) == event('f', 1) == [10]
+
+
+def test_trainer_metric():
+    from mp.trainer.metrics import Metric
+
+    class Value:
+        converted = 0
+
+        def __init__(self, value):
+            self.value = value
+
+        def __add__(self, other):
+            return Value(self.value + other.value)
+
+        def __float__(self):
+            Value.converted += 1
+            return float(self.value)
+
+    metric = Metric()
+    assert float(metric) != float(metric)
+    for value in (1., 2., 6.):
+        metric.add(Value(value))
+    snapshot = metric.snapshot()
+    metric.reset()
+    metric.add(Value(5.))
+    # converted when read only
+    assert Value.converted == 0
+    assert float(snapshot) == 3. and float(metric) == 5. and Value.converted == 2
@@ -1,6 +1,10 @@
 from mp import PyTorchInterpreter
 from mp import RemoteInterpreter
 
+from mp.core.attribute import CacheIndex, MemoryPlan
+from mp.core.compiler import CompiledGraph
+from mp.core.expression import Expression as Exp
+
 from mp.markdown import draw_graph, draw_script
 from mp.dataset import core
 
@@ -60,6 +64,312 @@ def test_pytorch_mnist():
     _test_markdown(interpreter)
 
 
+def test_pytorch_constant_folding():
+    interpreter = PyTorchInterpreter(_curdir())
+    interpreter('a = 64 * 7 * 7\nb = a + 1\nc = randn(2, 3 * 2)\nprint b, c')
+    assert interpreter.plan.stats['folded constants'] == 3
+    assert interpreter.plan.attr['a'].toward.is_constant
+    assert not interpreter.plan.attr['b'].toward.is_constant
+    assert int(interpreter.plan.attr['b'].get_value()) == 3137
+
+
+def test_pytorch_subtree_sharing():
+    interpreter = PyTorchInterpreter(_curdir())
+    interpreter('w = randn(3, 3)\nx = randn(2, 3)\n'
+                'a = relu(dense(x, w)) + relu(dense(x, w))\nb = x / 255. + x / 255.\nprint a, b')
+    assert interpreter.plan.stats['shared subtrees'] == 3
+    left, right = interpreter.plan.attr['a'].toward.args.list[:2]
+    assert left is right and left.shared
+    x = interpreter.plan.attr['x'].get_value()
+    b = interpreter.plan.attr['b'].get_value()
+    assert bool(((b - x * 2 / 255.).abs() < 1e-6).all())
+
+    # the empty bounds of the slices are compared
+    interpreter('n = 1\nx = float(randn(5))\na = x(n:)\nb = x(:n)\nc = x(::n)\nd = x(n::)\ne = x(n:)\n'
+                'print a, b, c, d, e')
+    shapes = [tuple(interpreter.plan.attr[name].get_value().shape) for name in 'abcde']
+    assert shapes == [(4,), (1,), (5,), (4,), (4,)]
+    a, b, e = [interpreter.plan.attr[name].toward for name in 'abe']
+    assert a is e and a is not b
+
+
+def test_pytorch_operator_fusion():
+    import torch
+    values = []
+    for fuse in (False, True):
+        torch.manual_seed(0)
+        interpreter = PyTorchInterpreter(_curdir())
+        interpreter.plan.FUSE_OPERATORS = fuse
+        interpreter('w = randn(4, 3)\nb = randn(4)\nx = randn(5, 3)\n'
+                    'a = relu(dense(x, w, b))\nc = sigmoid(conv1d(a[5, 1, 4], randn(2, 1, 3)))\nprint a, c')
+        values.append([interpreter.plan.attr[name].get_value() for name in ('a', 'c')])
+        assert interpreter.plan.stats['fused __nn_relu(__nn_dense)'] == int(fuse)
+        assert interpreter.plan.stats['fused __nn_sigmoid(__nn_conv1d)'] == int(fuse)
+    for plain, fused in zip(*values):
+        assert torch.equal(plain, fused)
+
+
+def test_pytorch_cache_index():
+    interpreter = PyTorchInterpreter(_curdir())
+    interpreter('optim = Adam(0.1)\nw = var(randn(4, 3), optim)\nx = relu(randn(5, 3) / 2. + 1)\n'
+                'loss = mean(dense(x, w)) + mean(x)\nprint loss')
+    loss_graph = interpreter.plan.attr['loss']
+    index = CacheIndex(loss_graph)
+    x = interpreter.plan.attr['x'].toward
+    assert x.shared and x not in index.dirty
+    value = x.get_value()
+    # weights changed in place (optim.step)
+    interpreter.plan.attr['w'].get_value().data += 1
+    index.invalidate()
+    loss = float(loss_graph.get_value())
+    assert x.get_value() is value
+    loss_graph.remove_cache()
+    assert loss == float(loss_graph.get_value())
+
+
+def test_pytorch_compiled_graph():
+    losses = []
+    for aot in (False, True):
+        interpreter = PyTorchInterpreter(_curdir())
+        interpreter('optim = Adam(0.1)\nw = var(randn(4, 3), optim)\nx = relu(tensor(5, 3) / 2. + 1)\n'
+                    'y = x[5, 3](1:3)\nloss = mean(dense(y, w)) + sum(w) ** 2\nprint loss')
+        loss_graph = interpreter.plan.attr['loss']
+        optim = interpreter.plan.attr['optim'].get_value()
+        index = CacheIndex(loss_graph)
+        compiled = CompiledGraph(loss_graph, index) if aot else None
+        if aot:
+            assert compiled.fallbacks == 0
+        losses.append([])
+        interpreter.plan.attr['w'].get_value().data.fill_(0.5)
+        for _ in range(3):
+            if aot:
+                loss = compiled()
+            else:
+                index.invalidate()
+                loss = loss_graph.get_value()
+            losses[-1].append(float(loss))
+            optim.zero_grad()
+            loss.backward()
+            optim.step()
+    assert losses[0] == losses[1]
+
+
+def test_pytorch_memory_plan():
+    import torch
+    losses = []
+    for release in (False, True):
+        torch.manual_seed(0)
+        interpreter = PyTorchInterpreter(_curdir())
+        interpreter('optim = Adam(0.1)\nw = var(randn(4, 3), optim)\nx = batch(randn(6, 3), 2)\n'
+                    'h = relu(dense(x, w))\nloss = mean(h * h) + sum(w) ** 2\nprint loss')
+        loss_graph = interpreter.plan.attr['loss']
+        optim = interpreter.plan.attr['optim'].get_value()
+        interpreter.plan.attr['w'].get_value().data.fill_(0.5)
+        Exp.EVENT('reset batch')
+        index = CacheIndex(loss_graph)
+        plan = MemoryPlan(index)
+        losses.append([])
+        for _ in range(3):
+            index.invalidate()
+            loss = loss_graph.get_value()
+            losses[-1].append(float(loss))
+            optim.zero_grad()
+            loss.backward()
+            optim.step()
+            if release:
+                plan.release()
+                # only the loss and the weights are left
+                assert interpreter.plan.attr['h'].value is None
+                assert all(node.value is None for node in plan.released)
+                assert loss_graph.value is loss
+                assert interpreter.plan.attr['w'].value is not None
+    assert losses[0] == losses[1]
+
+
+def test_pytorch_checkpoint():
+    import torch
+    grads = []
+    for segment in ('(%s)', 'checkpoint(%s)'):
+        interpreter = PyTorchInterpreter(_curdir())
+        interpreter('optim = Adam()\nw = var(randn(8, 8), optim)\nx = randn(12, 8)\n'
+                    'block = def(a, relu(dense(a, w)))\nh = %s\nloss = mean(%s ** 2)\nprint loss'
+                    % (segment % 'block(block(x))', segment % 'relu(dense(h, w)) * 2.'))
+        # the same values (evaluated in another order)
+        torch.manual_seed(0)
+        interpreter.plan.attr['w'].get_value().data.copy_(torch.randn(8, 8) / 4.)
+        interpreter.plan.attr['x'].get_value().copy_(torch.randn(12, 8))
+        loss_graph = interpreter.plan.attr['loss']
+        loss_graph.remove_cache()
+        loss_graph.get_value().backward()
+        grads.append(interpreter.plan.attr['w'].get_value().grad)
+    assert torch.equal(grads[0], grads[1])
+
+
+def test_pytorch_export():
+    import os
+    import torch
+    interpreter = PyTorchInterpreter(_curdir())
+    interpreter('optim = Adam()\nx = batch(randn(20, 1, 8, 8), 10)\nw = var(randn(4, 1, 3, 3), optim)\n'
+                'h = relu(conv2d(x, w, _padding=1))\nexported = dense(h[10, 4 * 8 * 8], var(randn(2, 256), optim))\n'
+                'path = export(exported)\nprint path')
+    path = interpreter.plan.attr['path'].get_value()
+    try:
+        module = torch.jit.load(path, map_location='cpu')
+        x = interpreter.plan.attr['x'].get_value()
+        assert torch.equal(module(x), interpreter.plan.attr['exported'].get_value())
+        assert len(list(module.parameters())) == 2
+    finally:
+        os.remove(path)
+
+
+def test_pytorch_compile_mode():
+    losses = []
+    for use_compile in (False, True):
+        interpreter = PyTorchInterpreter(_curdir(), use_compile=use_compile)
+        interpreter('optim = Adam(0.1)\nx = batch(tensor(20, 3) + 1, 10)\nw = var(tensor(2, 3) + 0.5, optim)\n'
+                    'loss = mean(dense(x, w) ** 2)\nmonitor = trace(step(optim, loss), 2)\nprint monitor')
+        losses.append(float(interpreter.plan.attr['monitor'].get_value()))
+    assert abs(losses[0] - losses[1]) < 1e-5
+
+
+def test_pytorch_autocast():
+    import torch
+    losses = []
+    for use_autocast, option in ((False, ''), (False, ', autocast=true'), (True, ''), (True, ', autocast=false')):
+        torch.manual_seed(0)
+        interpreter = PyTorchInterpreter(_curdir(), use_autocast=use_autocast)
+        interpreter('optim = Adam(0.1)\nx = batch(rand(20, 3) + 1, 10)\nw = var(tensor(2, 3) + 0.3, optim)\n'
+                    'loss = mean(dense(x, w) ** 2)\nmonitor = trace(step(optim, loss), 2%s)\nprint monitor' % option)
+        losses.append(float(interpreter.plan.attr['monitor'].get_value()))
+        # master weights
+        assert interpreter.plan.attr['w'].get_value().dtype == torch.float32
+    assert losses[0] == losses[3] and losses[1] == losses[2]
+    assert losses[0] != losses[1] and abs(losses[0] - losses[1]) < 1e-2 * losses[0]
+
+    interpreter('h = 1.5bf16 * 2\nprint h')
+    assert interpreter.plan.attr['h'].get_value().dtype == torch.bfloat16
+
+
+def test_pytorch_autocast_metric():
+    import torch
+    losses = []
+    for use_autocast in (False, True):
+        torch.manual_seed(0)
+        interpreter = PyTorchInterpreter(_curdir(), use_autocast=use_autocast)
+        # many steps (without training)
+        interpreter('optim = Adam(0.)\nx = batch(rand(2000, 3) + 1, 2)\nw = var(tensor(2, 3) + 0.3, optim)\n'
+                    'loss = mean(dense(x, w) ** 2)\nmonitor = trace(step(optim, loss), 1)\nprint monitor')
+        losses.append(float(interpreter.plan.attr['monitor'].get_value()))
+    assert abs(losses[0] - losses[1]) < 1e-2 * losses[0]
+
+
+def test_pytorch_gradient_accumulation():
+    import torch
+    weights = []
+    for batch_size, option in ((10, ''), (5, ', 2')):
+        interpreter = PyTorchInterpreter(_curdir())
+        interpreter('optim = Adam(0.1)\nx = batch(tensor(20, 3) + 1, %d)\nw = var(tensor(2, 3) + 0.5, optim)\n'
+                    'loss = mean(dense(x, w) ** 2)\nmonitor = trace(step(optim, loss%s), 2)\nprint monitor'
+                    % (batch_size, option))
+        weights.append(interpreter.plan.attr['w'].get_value())
+    assert torch.allclose(weights[0], weights[1])
+
+
+def test_pytorch_batch_prefetch():
+    import torch
+    losses = []
+    for option in ('', ', _prefetch=2'):
+        torch.manual_seed(0)
+        interpreter = PyTorchInterpreter(_curdir())
+        interpreter('optim = Adam(0.1)\ndata = rand(23, 3)\nx = batch(data, 5%s)\ny = batch(sum(data, 1), 5%s)\n'
+                    'w = var(tensor(1, 3) + 0.5, optim)\nloss = mean((dense(x, w) - y) ** 2)\n'
+                    'monitor = trace(step(optim, loss), 3)\nprint monitor' % (option, option))
+        losses.append(float(interpreter.plan.attr['monitor'].get_value()))
+    # x and y are still paired
+    assert losses[0] == losses[1]
+
+
+def test_pytorch_batch_shuffle():
+    import torch
+    torch.manual_seed(0)
+    interpreter = PyTorchInterpreter(_curdir())
+    interpreter('optim = Adam(0.1)\ndata = rand(23, 3)\nx = batch(data, 5, _shuffle=true)\n'
+                'y = batch(data * 2, 5, _shuffle=true, _prefetch=2)\nw = var(tensor(1, 3), optim)\n'
+                'loss = mean((x * 2 - y) ** 2) + mean(dense(x, w)) * 0\nmonitor = trace(step(optim, loss), 2)\n'
+                'print monitor')
+    # x and y are gathered in the same order
+    assert float(interpreter.plan.attr['monitor'].get_value()) == 0.
+    data = interpreter.plan.attr['data'].get_value()
+    x = interpreter.plan.attr['x']
+    Exp.EVENT('reset batch')
+    batches = torch.cat([x.toward.get_value() for _ in range(5)])
+    assert not torch.equal(batches, data)
+    assert torch.equal(batches[batches[:, 0].argsort()], data[data[:, 0].argsort()])
+
+    # created after the others were reset (one shared epoch)
+    interpreter = PyTorchInterpreter(_curdir())
+    interpreter('data = rand(23, 3)\nx = batch(data, 5, _shuffle=true)\nprint x')
+    Exp.EVENT('reset batch')
+    interpreter('z = batch(data * 2, 5, _shuffle=true)\nprint z')
+    x, z = interpreter.plan.attr['x'], interpreter.plan.attr['z']
+    for _ in range(3):
+        Exp.EVENT('reset batch')
+        assert torch.equal(x.toward.get_value() * 2, z.toward.get_value())
+
+
+def test_pytorch_mmap(tmp_path):
+    import os
+    import numpy as np
+    import torch
+    path = os.path.join(str(tmp_path), 'data.npy')
+    np.save(path, np.arange(12, dtype=np.float32).reshape(6, 2))
+    values = []
+    for option in (False, True, ['data'], ['label']):
+        interpreter = PyTorchInterpreter(str(tmp_path), use_mmap=option)
+        assert interpreter.plan.io.is_mapped('data') == (option is True or option == ['data'])
+        interpreter('x = batch(data, 4)\ny = sum(x)\nprint y')
+        values.append(float(interpreter.plan.attr['y'].get_value()))
+    assert values == [28.] * 4
+    # copy-on-write : the file is not modified
+    interpreter.plan.io.mmap = True
+    interpreter.plan.io.get('data').fill_(0)
+    assert np.load(path).sum() == 66.
+    assert torch.equal(interpreter.plan.io.get('data'), torch.arange(12.).view(6, 2))
+
+
+def test_dataset_decompress(tmp_path):
+    import gzip
+    import os
+    import numpy as np
+    images = np.random.randint(0, 256, (300, 1, 28, 28)).astype(np.uint8)
+    labels = np.random.randint(0, 10, 300).astype(np.uint8)
+    files = [
+        ('images', images, (-1, 1, 28, 28), b'\0\0\x08\x03' + b''.join(d.to_bytes(4, 'big') for d in (300, 28, 28))),
+        ('labels', labels, None, b'\0\0\x08\x01' + (300).to_bytes(4, 'big')),
+    ]
+    jobs = []
+    for name, value, shape, header in files:
+        path = os.path.join(str(tmp_path), name)
+        with gzip.open('%s.gz' % path, 'wb') as f:
+            f.write(header + value.tobytes())
+        jobs.append((name, path, 'gz', 'i8', shape, len(header)))
+    # smaller chunks than the files
+    chunk_size, core.CHUNK_SIZE_DECOMPRESS = core.CHUNK_SIZE_DECOMPRESS, 1000
+    try:
+        core.decompress_all(None, jobs, num_workers=2)
+    finally:
+        core.CHUNK_SIZE_DECOMPRESS = chunk_size
+    assert np.array_equal(np.load(os.path.join(str(tmp_path), 'images.npy')), images)
+    assert np.array_equal(np.load(os.path.join(str(tmp_path), 'labels.npy')), labels)
+
+    # without IDX header (the size of gzip)
+    path = os.path.join(str(tmp_path), 'raw')
+    with gzip.open('%s.gz' % path, 'wb') as f:
+        f.write(b'head' + labels.tobytes())
+    core.decompress(None, 'raw', path, 'gz', 'i8', offset=4)
+    assert np.array_equal(np.load('%s.npy' % path), labels)
+
+
 def test_remote():
     interpreter = RemoteInterpreter(_curdir())
     pass